@@ -0,0 +1,69 @@
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "game"))
+
+import pygame
+
+from main import Pipe, available_profiles, draw_pipe, load_profile, PIPE_WIDTH, PIPE_GREEN, PIPE_DARK_GREEN, SKY_BLUE
+
+def draw_pipe_primitives(screen, pipe):
+    # The pre-atlas Pipe.draw: ten draw calls per pipe, kept here as the baseline
+    gap = pipe.profile.pipe_gap
+    top_rect = (pipe.x, 0, PIPE_WIDTH, pipe.height)
+    bottom_rect = (pipe.x, pipe.height + gap, PIPE_WIDTH, pipe.profile.ground_y - pipe.height - gap)
+    pygame.draw.rect(screen, PIPE_GREEN, top_rect)
+    pygame.draw.rect(screen, PIPE_DARK_GREEN, top_rect, 2)
+
+    cap_height = 25
+    pygame.draw.rect(screen, PIPE_GREEN, (pipe.x - 4, pipe.height - cap_height, PIPE_WIDTH + 8, cap_height))
+    pygame.draw.rect(screen, PIPE_DARK_GREEN, (pipe.x - 4, pipe.height - cap_height, PIPE_WIDTH + 8, cap_height), 2)
+
+    pygame.draw.rect(screen, PIPE_GREEN, bottom_rect)
+    pygame.draw.rect(screen, PIPE_DARK_GREEN, bottom_rect, 2)
+
+    pygame.draw.rect(screen, PIPE_GREEN, (pipe.x - 4, pipe.height + gap, PIPE_WIDTH + 8, cap_height))
+    pygame.draw.rect(screen, PIPE_DARK_GREEN, (pipe.x - 4, pipe.height + gap, PIPE_WIDTH + 8, cap_height), 2)
+
+    pygame.draw.line(screen, (100, 200, 100), (pipe.x + 10, 0), (pipe.x + 10, pipe.height - cap_height), 3)
+    pygame.draw.line(screen, (100, 200, 100), (pipe.x + 10, pipe.height + gap + cap_height), (pipe.x + 10, pipe.profile.screen_height), 3)
+
+def draw_pipe_atlas(screen, pipe):
+    draw_pipe(screen, pipe)
+
+def frame_time(screen, pipes, draw, frames):
+    start = time.perf_counter()
+    for _ in range(frames):
+        screen.fill(SKY_BLUE)
+        for pipe in pipes:
+            draw(screen, pipe)
+    return (time.perf_counter() - start) / frames
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipe drawing: primitives vs cached atlas")
+    parser.add_argument("--pipes", type=int, nargs="+", default=[3, 10, 50, 200])
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--profile", choices=available_profiles())
+    args = parser.parse_args()
+
+    profile = load_profile(args.profile)
+    pygame.display.init()
+    screen = pygame.display.set_mode((profile.screen_width, profile.screen_height))
+
+    print(f"{'pipes':>6} {'primitives ms':>14} {'atlas ms':>10} {'speedup':>8}")
+    for count in args.pipes:
+        spacing = (profile.screen_width + PIPE_WIDTH) / count
+        pipes = [Pipe(int(i * spacing) - PIPE_WIDTH // 2, profile=profile) for i in range(count)]
+        frame_time(screen, pipes, draw_pipe_atlas, 10)  # builds the atlas outside the timing
+        old = frame_time(screen, pipes, draw_pipe_primitives, args.frames)
+        new = frame_time(screen, pipes, draw_pipe_atlas, args.frames)
+        print(f"{count:>6} {old * 1000:>14.3f} {new * 1000:>10.3f} {old / new:>7.2f}x")
+
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Check cold-start time of each entry point against a budget.
+
+    python benchmarks/startup_budget.py              # exit status 1 if anything is over budget
+    python benchmarks/startup_budget.py --update     # re-derive budgets from this machine
+
+Every check runs in a fresh interpreter (best of --repeat) and times the
+import plus the first unit of work. Besides the times, the headless checks
+fail if pygame gets imported at all, and the window checks fail if any
+subsystem beyond display and font was initialized. Budgets live in
+startup_budget.json next to this file.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GAME_DIR = os.path.join(HERE, "..", "game")
+BUDGET_FILE = os.path.join(HERE, "startup_budget.json")
+
+# Snippets run inside HARNESS, timed from just after interpreter start, and may append to problems
+CHECKS = {
+    "headless_import": """
+import core
+""",
+    "headless_replay": """
+import core
+sim = core.Simulation(1, "desktop")
+sim.step(core.FLAP)
+while sim.step(core.FLAP if sim.bird.y > 300 else core.NOOP) and sim.frame < 600:
+    pass
+core.run_replay(sim.to_replay())
+""",
+    "offscreen_game": """
+import main
+game = main.Game(seed=1, offscreen=True)
+game.draw()
+import pygame
+if pygame.display.get_init():
+    problems.append("offscreen Game initialized the display")
+""",
+    "window_game": """
+import main
+game = main.Game(seed=1)
+game.draw()
+game.present()
+""",
+}
+
+HARNESS = """
+import sys, time
+start = time.perf_counter()
+problems = []
+{body}
+elapsed = time.perf_counter() - start
+headless = {headless!r}
+if headless and "pygame" in sys.modules:
+    problems.append("imported pygame")
+if not headless:
+    import pygame
+    for name in ("mixer", "joystick", "scrap"):
+        module = getattr(pygame, name, None)
+        if module is not None and getattr(module, "get_init", lambda: False)():
+            problems.append(f"initialized pygame.{{name}}")
+import json
+print(json.dumps({{"elapsed": elapsed, "problems": problems}}))
+"""
+
+def measure(name, repeat):
+    # Best time over repeat fresh interpreters, plus every problem any run reported
+    code = HARNESS.format(body=CHECKS[name], headless=name.startswith("headless"))
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    best, problems = None, set()
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], cwd=GAME_DIR, env=env,
+                             capture_output=True, text=True, check=True)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        best = result["elapsed"] if best is None else min(best, result["elapsed"])
+        problems.update(result["problems"])
+    return best * 1000, sorted(problems)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--update", action="store_true",
+                        help="write measured times x --headroom to startup_budget.json")
+    parser.add_argument("--headroom", type=float, default=2.0)
+    args = parser.parse_args()
+
+    with open(BUDGET_FILE) as f:
+        budgets = json.load(f)
+    failed = False
+    measured = {}
+    print(f"{'check':<18} {'ms':>8} {'budget':>8}")
+    for name in CHECKS:
+        ms, problems = measure(name, args.repeat)
+        measured[name] = ms
+        budget = budgets.get(name)
+        over = budget is not None and ms > budget and not args.update
+        status = "OVER BUDGET" if over else ""
+        print(f"{name:<18} {ms:>8.1f} {budget if budget is not None else '-':>8} {status}")
+        for problem in problems:
+            print(f"  {name}: {problem}")
+        failed |= over or bool(problems)
+
+    if args.update:
+        budgets = {name: round(ms * args.headroom) for name, ms in measured.items()}
+        with open(BUDGET_FILE, "w") as f:
+            json.dump(budgets, f, indent=2)
+            f.write("\n")
+        print(f"wrote {BUDGET_FILE}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+"""Benchmark suite for the simulation and rendering hot paths.
+
+    python benchmarks/suite.py run [--profile web] [--label NAME]
+    python benchmarks/suite.py compare [--threshold 0.1] [--against LABEL]
+
+run times physics steps, collision checks, each draw call on an offscreen
+dummy-video display and game startup, then appends the results to a JSON
+history file (benchmarks/history.json by default; machine-specific, not
+committed). compare checks the latest run against the previous one (or
+the latest run with --against LABEL) and exits with status 1 if anything
+regressed by more than both the threshold and the noise, the spread of
+the samples in either run. Samples are taken round robin across the
+benchmarks so a slow spell on the machine can't skew just one of them.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+HERE = os.path.dirname(os.path.abspath(__file__))
+GAME_DIR = os.path.join(HERE, "..", "game")
+sys.path.insert(0, GAME_DIR)
+
+import pygame
+
+from main import Game, Pipe, Simulation, available_profiles, draw_bird, draw_pipe, gap_chaser, load_profile, FLAP
+
+DEFAULT_HISTORY = os.path.join(HERE, "history.json")
+MIN_TIME = 0.2  # Seconds each timed batch should take at least
+STARTUP_SAMPLES = 3  # Cold starts per round
+
+def noise(samples):
+    # Spread of the repeats as a fraction of the best one, leaving out the
+    # slowest as a likely preemption spike; compare won't call a change
+    # smaller than this a regression
+    ordered = sorted(samples)
+    worst = ordered[-2] if len(ordered) > 2 else ordered[-1]
+    return (worst - ordered[0]) / ordered[0] if ordered[0] else 0.0
+
+def batch_timer(func):
+    # A sample() giving seconds per call over one batch, its size calibrated
+    # so timer resolution and loop overhead don't matter
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        if time.perf_counter() - start >= MIN_TIME:
+            break
+        number *= 2
+
+    def sample():
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        return (time.perf_counter() - start) / number
+    return sample
+
+# Each bench_* sets up its benchmarks and returns {name: (sample, samples
+# per round, seconds -> value, unit, higher_is_better)}
+
+def bench_sim_steps(profile):
+    # Bird.update + update_pipes through Simulation.step, actions precomputed
+    # from one gap_chaser game (long, and it hits every pipe branch) so the
+    # policy isn't timed
+    sim = Simulation(1, profile)
+    sim.step(FLAP)
+    actions = [FLAP]
+    while not sim.game_over and sim.frame < 5000:
+        action = gap_chaser(sim)
+        actions.append(action)
+        sim.step(action)
+
+    def run():
+        sim.reset(1)
+        for action in actions:
+            sim.step(action)
+    return {"sim_steps": (batch_timer(run), 1, lambda seconds: len(actions) / seconds, "steps/s", True)}
+
+def bench_collisions(profile):
+    rng = random.Random(0)
+    sim = Simulation(0, profile)
+    bird = sim.bird
+    pipes = [Pipe(rng.randint(0, profile.screen_width), rng.randint(50, 250), profile) for _ in range(64)]
+
+    def run():
+        for pipe in pipes:
+            pipe.collides_with(bird)
+    return {"collisions": (batch_timer(run), 1, lambda seconds: len(pipes) / seconds, "checks/s", True)}
+
+def playing_game(profile, frames=200):
+    # A game mid-flight with pipes on screen and a score to draw
+    game = Game(seed=3, profile=profile)
+    game.sim.step(FLAP)
+    while game.sim.frame < frames and not game.sim.game_over:
+        game.action = gap_chaser(game.sim)
+        game.step()
+    return game
+
+def bench_draws(profile):
+    game = playing_game(profile)
+    screen = game.screen
+    bird = game.sim.bird
+    pipe = game.sim.pipes[0]
+    game.draw(0.5)  # Builds the cached sprites, atlas and glyphs outside the timing
+
+    def micros(func):
+        return batch_timer(func), 1, lambda seconds: seconds * 1e6, "us", False
+    return {
+        "draw_bird": micros(lambda: draw_bird(screen, bird)),
+        "draw_pipe": micros(lambda: draw_pipe(screen, pipe)),
+        "draw_background": micros(lambda: game.draw_background(0.5)),
+        "draw_ui": micros(game.draw_ui),
+        "draw_frame": micros(lambda: game.draw(0.5)),
+    }
+
+STARTUP = """
+import time
+start = time.perf_counter()
+import main
+game = main.Game(seed=1, profile={profile!r})
+game.draw()
+print(time.perf_counter() - start)
+"""
+
+def bench_startup(profile):
+    # Fresh interpreter each time: import, window, first frame. A cold start
+    # is one noisy sample rather than a calibrated batch, so take more of them.
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+
+    def sample():
+        out = subprocess.run([sys.executable, "-c", STARTUP.format(profile=profile.name)],
+                             cwd=GAME_DIR, env=env, capture_output=True, text=True, check=True)
+        return float(out.stdout.strip().splitlines()[-1])
+    return {"startup": (sample, STARTUP_SAMPLES, lambda seconds: seconds * 1000, "ms", False)}
+
+def run_suite(profile, repeat):
+    # Round robin: every round takes samples of every benchmark, so a slow
+    # spell on the machine spoils one sample of each rather than all of one.
+    # Results are (best value, unit, higher_is_better, noise).
+    benches = {}
+    for bench in (bench_sim_steps, bench_collisions, bench_draws, bench_startup):
+        benches.update(bench(profile))
+    samples = {name: [] for name in benches}
+    for _ in range(repeat):
+        for name, (sample, count, _, _, _) in benches.items():
+            samples[name].extend(sample() for _ in range(count))
+    return {name: (convert(min(samples[name])), unit, higher, noise(samples[name]))
+            for name, (_, _, convert, unit, higher) in benches.items()}
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+def save_history(path, history):
+    with open(path, "w") as f:
+        json.dump(history, f, indent=1)
+
+def format_value(value, unit):
+    return f"{value:,.0f} {unit}" if value >= 1000 else f"{value:.2f} {unit}"
+
+def compare_runs(base, head, threshold):
+    # Returns the names that got worse by more than both threshold (as a
+    # fraction) and the noisier run's measured spread
+    regressions = []
+    print(f"{'benchmark':<16} {'base':>20} {'head':>20} {'change':>8} {'allowed':>8}")
+    for name, result in head["results"].items():
+        if name not in base["results"]:
+            continue
+        old, new = base["results"][name]["value"], result["value"]
+        change = (new - old) / old if old else 0.0
+        worse = -change if result["higher_is_better"] else change
+        # Runs recorded before noise was measured count as noise-free
+        spread = max(base["results"][name].get("noise", 0.0), result.get("noise", 0.0))
+        allowed = max(threshold, spread)
+        flag = ""
+        if worse > allowed:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<16} {format_value(old, result['unit']):>20} "
+              f"{format_value(new, result['unit']):>20} {change:>+8.1%} {allowed:>8.1%}{flag}")
+    return regressions
+
+def describe(run):
+    return f"{run.get('label') or run.get('commit') or '?'} ({run['time']}, {run['profile']})"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run the suite and append to the history")
+    run_parser.add_argument("--profile", choices=available_profiles())
+    run_parser.add_argument("--repeat", type=int, default=5, help="rounds of samples per benchmark (best is kept)")
+    run_parser.add_argument("--label", help="name this run for compare --against")
+    compare_parser = commands.add_parser("compare", help="compare the latest run with an earlier one")
+    compare_parser.add_argument("--threshold", type=float, default=0.10,
+                                help="relative slowdown counted as a regression (default 0.10)")
+    compare_parser.add_argument("--against", metavar="LABEL", help="baseline run label (default: previous run)")
+    for sub in (run_parser, compare_parser):
+        sub.add_argument("--history", default=DEFAULT_HISTORY)
+    args = parser.parse_args()
+
+    history = load_history(args.history)
+    if args.command == "run":
+        profile = load_profile(args.profile)
+        pygame.display.init()
+        pygame.font.init()
+        results = run_suite(profile, args.repeat)
+        pygame.quit()
+        for name, (value, unit, _, spread) in results.items():
+            print(f"{name:<16} {format_value(value, unit):>20}  ±{spread:.1%}")
+        history.append({
+            "time": datetime.datetime.now().isoformat(timespec="seconds"),
+            "label": args.label,
+            "commit": git_commit(),
+            "profile": profile.name,
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "machine": platform.platform(),
+            "results": {name: {"value": value, "unit": unit, "higher_is_better": higher, "noise": spread}
+                        for name, (value, unit, higher, spread) in results.items()},
+        })
+        save_history(args.history, history)
+        return 0
+
+    if not history:
+        print(f"no runs in {args.history}")
+        return 1
+    head = history[-1]
+    # Only runs of the same profile are comparable
+    candidates = [run for run in history[:-1] if run["profile"] == head["profile"]]
+    if args.against:
+        candidates = [run for run in candidates if run.get("label") == args.against]
+    if not candidates:
+        print("no earlier run to compare with")
+        return 1
+    base = candidates[-1]
+    print(f"base: {describe(base)}\nhead: {describe(head)}")
+    regressions = compare_runs(base, head, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%} and the noise: {', '.join(regressions)}")
+        return 1
+    print(f"no regressions beyond {args.threshold:.0%} and the noise")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
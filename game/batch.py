@@ -0,0 +1,216 @@
+import argparse
+import random
+import sys
+
+import numpy as np
+
+from core import (Bird, Simulation, PipeHeights, available_profiles, gap_chaser, load_profile, new_seed, pipe_capacity,
+                  PIPE_WIDTH, PIPE_SPEED, PIPE_INTERVAL, HITBOX_INSET, FLAP, NOOP)
+
+def narrow_window(lo, hi, a, b):
+    # core.narrow_window over arrays: shrinks (lo, hi] to the t where a + b*t > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = -a / b
+    lo = np.where(b > 0, np.maximum(lo, t), lo)
+    hi = np.where(b < 0, np.minimum(hi, t), hi)
+    return lo, np.where((b == 0) & (a <= 0), -1.0, hi)
+
+class BatchSimulation:
+    """N independent games stepped in lockstep with NumPy.
+
+    Mirrors Simulation.step() exactly: bird state lives in (N,) arrays and
+    pipes in (N, pipe_slots) arrays, with the slot of the k-th pipe of a game
+    being k % pipe_slots.
+    """
+
+    def __init__(self, n, seeds=None, profile=None, swept=True):
+        self.n = n
+        self.profile = load_profile(profile)
+        self.swept = swept
+        # Bird constants come from a real Bird so the two paths can't disagree
+        self.bird = Bird(self.profile)
+        self.pipe_slots = pipe_capacity(self.profile)
+        if seeds is None:
+            seeds = [new_seed() for _ in range(n)]
+        self.seeds = list(seeds)
+        if len(self.seeds) != n:
+            raise ValueError(f"expected {n} seeds, got {len(self.seeds)}")
+        self.reset()
+
+    def reset(self):
+        n = self.n
+        # Upcoming gap heights, one row per game, refilled a block at a time
+        # from the same seeded streams the scalar Simulation uses
+        self.heights = [PipeHeights(seed, self.profile) for seed in self.seeds]
+        self.height_block = np.array([h.draw_block() for h in self.heights], dtype=np.int64)
+        self.height_index = np.zeros(n, dtype=np.int64)
+        self.y = np.full(n, self.bird.y, dtype=np.float64)
+        self.prev_y = self.y.copy()
+        self.velocity = np.zeros(n)
+        self.rotation = np.zeros(n)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.pipe_timer = np.zeros(n, dtype=np.int64)
+        self.game_over = np.zeros(n, dtype=bool)
+        self.game_started = np.zeros(n, dtype=bool)
+        self.frame = 0
+
+        shape = (n, self.pipe_slots)
+        self.pipe_x = np.zeros(shape, dtype=np.int64)
+        self.pipe_height = np.zeros(shape, dtype=np.int64)
+        self.pipe_active = np.zeros(shape, dtype=bool)
+        self.pipe_passed = np.zeros(shape, dtype=bool)
+        self.pipes_spawned = np.zeros(n, dtype=np.int64)
+
+    @property
+    def done(self):
+        return bool(self.game_over.all())
+
+    def next_pipe(self):
+        """(x, height) of each game's nearest pipe the bird hasn't cleared yet.
+
+        Games with no such pipe on screen get the spawn position and a
+        centred gap, as a placeholder for the pipe that is coming.
+        """
+        ahead = self.pipe_active & (self.pipe_x + PIPE_WIDTH >= self.bird.x)
+        slot = np.where(ahead, self.pipe_x, np.iinfo(np.int64).max).argmin(axis=1)
+        rows = np.arange(self.n)
+        found = ahead[rows, slot]
+        x = np.where(found, self.pipe_x[rows, slot], self.profile.screen_width)
+        height = np.where(found, self.pipe_height[rows, slot], (self.profile.ground_y - self.profile.pipe_gap) // 2)
+        return x, height
+
+    def spawn_pipes(self, mask):
+        games = np.flatnonzero(mask)
+        if not len(games):
+            return
+        for i in games[self.height_index[games] == PipeHeights.BLOCK]:
+            self.height_block[i] = self.heights[i].draw_block()
+            self.height_index[i] = 0
+
+        slots = self.pipes_spawned[games] % self.pipe_slots
+        self.pipe_x[games, slots] = self.profile.screen_width
+        self.pipe_height[games, slots] = self.height_block[games, self.height_index[games]]
+        self.pipe_active[games, slots] = True
+        self.pipe_passed[games, slots] = False
+        self.height_index[games] += 1
+        self.pipes_spawned[games] += 1
+
+    def collisions(self):
+        # core.swept_pipe_hit for every (game, pipe slot) at once, on the same integer boxes
+        left = int(self.bird.x + HITBOX_INSET)
+        size = self.bird.hitbox_size
+        top1 = np.trunc(self.y + HITBOX_INSET).astype(np.int64)[:, None]
+        if self.swept:
+            top0 = np.trunc(self.prev_y + HITBOX_INSET).astype(np.int64)[:, None]
+            dx = -PIPE_SPEED
+        else:
+            top0, dx = top1, 0
+        x0 = self.pipe_x - dx
+        dy = top1 - top0
+
+        lo, hi = narrow_window(0.0, 1.0, x0 + PIPE_WIDTH - left, dx)
+        lo, hi = narrow_window(lo, hi, left + size - x0, -dx)
+        top_lo, top_hi = narrow_window(lo, hi, self.pipe_height - top0, -dy)
+        lo, hi = narrow_window(lo, hi, self.profile.ground_y - top0, -dy)
+        lo, hi = narrow_window(lo, hi, top0 + size - self.pipe_height - self.profile.pipe_gap, dy)
+        return (top_lo < top_hi) | (lo < hi)
+
+    def step(self, actions):
+        """Advance every game one frame. actions is an (N,) array of NOOP/FLAP."""
+        actions = np.asarray(actions)
+
+        flap = (actions == FLAP) & ~self.game_over
+        self.game_started |= flap
+        self.velocity[flap] = self.bird.jump_strength
+        self.rotation[flap] = 45
+
+        live = self.game_started & ~self.game_over
+        if live.any():
+            self.update_birds(live)
+            self.update_pipes(live)
+            self.game_over |= live & ((self.y <= 0) | (self.y >= self.bird.floor_y))
+
+        self.frame += 1
+        return ~self.game_over
+
+    def update_birds(self, live):
+        self.prev_y = self.y
+        velocity = np.where(live, self.velocity + self.bird.gravity, self.velocity)
+        y = np.where(live, self.y + velocity, self.y)
+        rotation = np.where(velocity < 0, 25, np.maximum(-90, self.rotation - 3))
+        self.rotation = np.where(live, rotation, self.rotation)
+
+        ceiling = live & (y < 0)
+        y[ceiling] = 0
+        velocity[ceiling] = 0
+        floor_y = self.bird.floor_y
+        y[live & (y > floor_y)] = floor_y
+        self.y = y
+        self.velocity = velocity
+
+    def update_pipes(self, live):
+        self.pipe_timer[live] += 1
+        spawn = live & (self.pipe_timer > PIPE_INTERVAL)
+        self.pipe_timer[spawn] = 0
+        self.spawn_pipes(spawn)
+
+        moving = live[:, None] & self.pipe_active
+        self.pipe_x -= PIPE_SPEED * moving
+
+        passed = moving & ~self.pipe_passed & (self.pipe_x + PIPE_WIDTH < self.bird.x)
+        self.pipe_passed |= passed
+        self.score += passed.sum(axis=1)
+
+        self.game_over |= (moving & self.collisions()).any(axis=1)
+        self.pipe_active &= ~(moving & (self.pipe_x + PIPE_WIDTH < 0))
+
+def _parity_action(sim, rng, skill):
+    # Noisy gap_chaser: good enough to pass pipes, bad enough to eventually
+    # crash into every kind of obstacle
+    if rng.random() > skill:
+        return FLAP if rng.random() < 0.1 else NOOP
+    return gap_chaser(sim)
+
+def check_parity(n=64, frames=3000, seed=0, profile=None):
+    """Step a BatchSimulation and n scalar Simulations side by side and raise
+    AssertionError on the first frame where any game's state differs."""
+    seeds = [seed * 100003 + i for i in range(n)]
+    batch = BatchSimulation(n, seeds, profile)
+    sims = [Simulation(s, batch.profile) for s in seeds]
+    policy = random.Random(seed)
+    skills = [policy.uniform(0.9, 1.0) for _ in range(n)]
+
+    for frame in range(frames):
+        actions = np.array([_parity_action(sim, policy, skill) for sim, skill in zip(sims, skills)])
+        batch.step(actions)
+        for i, sim in enumerate(sims):
+            sim.step(actions[i])
+            got = (batch.y[i], batch.velocity[i], batch.rotation[i], batch.score[i],
+                   batch.game_over[i], batch.game_started[i], batch.pipe_timer[i])
+            want = (sim.bird.y, sim.bird.velocity, sim.bird.rotation, sim.score,
+                    sim.game_over, sim.game_started, sim.pipe_timer)
+            assert got == want, f"frame {frame}, game {i}: batch {got} != scalar {want}"
+
+            active = batch.pipe_active[i]
+            got_pipes = sorted(zip(batch.pipe_x[i][active], batch.pipe_height[i][active],
+                                   batch.pipe_passed[i][active]))
+            want_pipes = sorted((p.x, p.height, p.passed) for p in sim.pipes)
+            assert got_pipes == want_pipes, f"frame {frame}, game {i}: pipes {got_pipes} != {want_pipes}"
+        if batch.done:
+            break
+    return frame + 1, int(batch.score.max())
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check BatchSimulation against the scalar Simulation")
+    parser.add_argument("--games", type=int, default=64)
+    parser.add_argument("--frames", type=int, default=3000)
+    parser.add_argument("--seeds", type=int, default=5, help="number of independent parity runs")
+    parser.add_argument("--profile", choices=available_profiles(), action="append",
+                        help="profile to check (repeatable; default: all)")
+    args = parser.parse_args()
+
+    for profile in args.profile or available_profiles():
+        for seed in range(args.seeds):
+            frames, best = check_parity(args.games, args.frames, seed, profile)
+            print(f"{profile} seed {seed}: {args.games} games matched for {frames} frames (best score {best})")
+    sys.exit(0)
@@ -0,0 +1,389 @@
+import json
+import operator
+import os
+import random
+import sys
+from collections import deque
+
+from replay import Replay, VERSION as REPLAY_VERSION
+from timings import NULL_TIMER
+
+# Game rules without any pygame: importable by headless tools, pool workers
+# and the server without loading SDL. main.py re-exports all of it and adds
+# rendering and input. Screen size, ground, gap and bird size come from a
+# Profile (see profiles/*.json).
+PIPE_WIDTH = 50
+PIPE_SPEED = 3
+PIPE_INTERVAL = 90  # Frames between pipes (approx 1.5s at 60 FPS)
+HITBOX_INSET = 8   # The bird's hitbox is smaller than its sprite, for gameplay forgiveness
+
+# Simulation actions
+NOOP = 0
+FLAP = 1
+
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles")
+_profiles = {}
+
+class Profile:
+    # Everything that differs between builds: resolution and difficulty.
+    # One engine runs every profile; the web bundle ships only web.json.
+    def __init__(self, name, screen_width, screen_height, ground_height, pipe_gap, bird_size,
+                 cloud_layers=1, cloud_density=5):
+        self.name = name
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.ground_height = ground_height
+        self.pipe_gap = pipe_gap
+        self.bird_size = bird_size
+        # Background only: parallax cloud layers and clouds per layer
+        self.cloud_layers = cloud_layers
+        self.cloud_density = cloud_density
+
+    @property
+    def ground_y(self):
+        return self.screen_height - self.ground_height
+
+    def __repr__(self):
+        return f"Profile({self.name!r}, {self.screen_width}x{self.screen_height})"
+
+def available_profiles():
+    return sorted(name[:-5] for name in os.listdir(PROFILE_DIR) if name.endswith(".json"))
+
+def default_profile_name():
+    # FLAPPY_PROFILE wins; pygbag builds run under emscripten and use the web profile
+    return os.environ.get("FLAPPY_PROFILE") or ("web" if sys.platform == "emscripten" else "desktop")
+
+def load_profile(name=None):
+    """Return the named profile (default: default_profile_name()), loaded once."""
+    if isinstance(name, Profile):
+        return name
+    if name is None:
+        name = default_profile_name()
+    profile = _profiles.get(name)
+    if profile is None:
+        with open(os.path.join(PROFILE_DIR, f"{name}.json")) as f:
+            profile = _profiles[name] = Profile(name, **json.load(f))
+    return profile
+
+class Bird:
+    def __init__(self, profile=None):
+        profile = load_profile(profile)
+        self.x = 80
+        self.y = profile.screen_height // 2
+        self.velocity = 0
+        self.gravity = 0.5
+        self.jump_strength = -8
+        self.size = profile.bird_size
+        self.rotation = 0
+        self.floor_y = profile.ground_y - self.size
+        self.hitbox_size = self.size - 2 * HITBOX_INSET
+        self.prev_y = self.y  # Where this step's move started, for swept collisions
+        
+    def update(self):
+        self.prev_y = self.y
+        self.velocity += self.gravity
+        self.y += self.velocity
+        
+        # Rotation based on velocity
+        if self.velocity < 0:
+            self.rotation = 25
+        else:
+            self.rotation = max(-90, self.rotation - 3)
+        
+        if self.y < 0:
+            self.y = 0
+            self.velocity = 0
+        elif self.y > self.floor_y:
+            self.y = self.floor_y
+    
+    def jump(self):
+        self.velocity = self.jump_strength
+        self.rotation = 45
+    
+    def hitbox(self):
+        # (left, top at the start of the step, top now, size), truncated like Rect coordinates
+        return (int(self.x + HITBOX_INSET), int(self.prev_y + HITBOX_INSET),
+                int(self.y + HITBOX_INSET), self.hitbox_size)
+
+def random_pipe_height(rng=random, profile=None):
+    profile = load_profile(profile)
+    return rng.randint(50, profile.ground_y - profile.pipe_gap - 50)
+
+SEED_LIMIT = 2**32  # new_seed() and --seed draw from [0, SEED_LIMIT)
+REPLAY_SEED_LIMIT = 2**64  # The widest seed a replay header can store
+
+def new_seed():
+    return random.randrange(SEED_LIMIT)
+
+def check_seed(seed, limit=REPLAY_SEED_LIMIT):
+    # Any integer type (numpy's too) that a replay can store, as a plain int
+    seed = operator.index(seed)
+    if not 0 <= seed < limit:
+        raise ValueError(f"seed must be in [0, {limit}), got {seed}")
+    return seed
+
+def seed_arg(text):
+    # argparse type for --seed options: the range new_seed() draws from
+    import argparse  # Only ever called while argparse is parsing
+    try:
+        return check_seed(int(text), SEED_LIMIT)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"must be an integer in [0, {SEED_LIMIT}), got {text!r}")
+
+class PipeHeights:
+    # Gap heights for one course, drawn in blocks from a private seeded stream.
+    # random.Random is the same Mersenne Twister on desktop, headless and
+    # pygbag builds, so a seed always produces the same course.
+    BLOCK = 64
+
+    def __init__(self, seed, profile=None):
+        self.rng = random.Random(seed)
+        self.profile = load_profile(profile)
+        self.block = []
+        self.index = 0
+
+    def draw_block(self):
+        return [random_pipe_height(self.rng, self.profile) for _ in range(self.BLOCK)]
+
+    def next(self):
+        if self.index == len(self.block):
+            self.block = self.draw_block()
+            self.index = 0
+        height = self.block[self.index]
+        self.index += 1
+        return height
+
+def narrow_window(lo, hi, a, b):
+    # Shrinks the window of step times (lo, hi] to where a + b*t > 0
+    if b > 0:
+        return max(lo, -a / b), hi
+    if b < 0:
+        return lo, min(hi, -a / b)
+    return (lo, hi) if a > 0 else (1.0, 0.0)
+
+def swept_pipe_hit(hitbox, x0, x1, height, profile):
+    """Does the bird's hitbox touch the pipe at any time t in (0, 1] of a step?
+
+    Over the step the hitbox top moves linearly from top0 to top1 and the
+    pipe from x0 to x1. Overlap uses the same strict inequalities as
+    Rect.colliderect(), so at t = 1 this is exactly the discrete test on
+    the end-of-step boxes; in between it catches hitboxes that cross a pipe
+    lip or body without ending the step inside it.
+    """
+    left, top0, top1, size = hitbox
+    dx, dy = x1 - x0, top1 - top0
+    # x-spans overlap: left < x + PIPE_WIDTH and left + size > x
+    lo, hi = narrow_window(0.0, 1.0, x0 + PIPE_WIDTH - left, dx)
+    lo, hi = narrow_window(lo, hi, left + size - x0, -dx)
+    if lo >= hi:
+        return False
+    # Top pipe spans y in [0, height): top < height
+    top_lo, top_hi = narrow_window(lo, hi, height - top0, -dy)
+    if top_lo < top_hi:
+        return True
+    # Bottom pipe spans [height + gap, ground_y): top < ground_y and top + size > height + gap
+    lo, hi = narrow_window(lo, hi, profile.ground_y - top0, -dy)
+    lo, hi = narrow_window(lo, hi, top0 + size - height - profile.pipe_gap, dy)
+    return lo < hi
+
+class Pipe:
+    # Pipes are pooled and recycled by PipePool, so the attribute set is fixed
+    __slots__ = ("profile", "x", "height", "passed")
+
+    def __init__(self, x, height=None, profile=None):
+        self.profile = profile = load_profile(profile)
+        self.reset(x, random_pipe_height(profile=profile) if height is None else height)
+
+    def reset(self, x, height):
+        # Turns this object into a fresh pipe at x
+        self.x = x
+        self.height = height
+        self.passed = False
+        
+    def update(self, speed):
+        self.x -= speed
+        
+    def collides_with(self, bird):
+        # Swept over the step that just moved both, at PIPE_SPEED
+        return swept_pipe_hit(bird.hitbox(), self.x + PIPE_SPEED, self.x, self.height, self.profile)
+
+def pipe_capacity(profile):
+    # Max pipes alive at once: a pipe lives (screen width + PIPE_WIDTH) / PIPE_SPEED
+    # frames and a new one spawns every PIPE_INTERVAL + 1 frames
+    return (profile.screen_width + PIPE_WIDTH) // (PIPE_SPEED * (PIPE_INTERVAL + 1)) + 2
+
+class PipePool:
+    """Reusable Pipe objects: live pipes leftmost first, plus a free list.
+
+    Every pipe spawns at the right edge and moves at the same speed, so
+    spawn order is x order: new pipes go on the tail of the live ring (a
+    deque) and only the head can leave the screen. After the pool is
+    built, spawning and despawning allocate nothing.
+    """
+
+    def __init__(self, profile):
+        self.profile = profile
+        self.live = deque()
+        self.free = [Pipe(0, 0, profile) for _ in range(pipe_capacity(profile))]
+
+    def spawn(self, x, height):
+        # An empty free list only happens with a profile the capacity formula misjudged
+        pipe = self.free.pop() if self.free else Pipe(0, 0, self.profile)
+        pipe.reset(x, height)
+        self.live.append(pipe)
+        return pipe
+
+    def despawn_head(self):
+        self.free.append(self.live.popleft())
+
+    def clear(self):
+        self.free.extend(self.live)
+        self.live.clear()
+
+class Simulation:
+    """Display-free game state, advanced one frame per step() call."""
+
+    timer = NULL_TIMER  # Game swaps in a FrameTimer to time the physics phases
+
+    def __init__(self, seed=None, profile=None, swept=True):
+        self.profile = load_profile(profile)
+        # Version 1 replays predate swept collisions and only test end-of-step boxes
+        self.swept = swept
+        self.pipe_pool = PipePool(self.profile)  # Reused by every reset()
+        self.pipes = self.pipe_pool.live
+        self.reset(new_seed() if seed is None else seed)
+
+    def reset(self, seed=None):
+        # The same seed replays the same course; reset() alone restarts it
+        if seed is not None:
+            self.seed = check_seed(seed)
+        self.heights = PipeHeights(self.seed, self.profile)
+        self.flaps = []  # Frames where a flap was applied, for replays
+        self.bird = Bird(self.profile)
+        self.pipe_pool.clear()
+        self.pipe_timer = 0
+        self.score = 0
+        self.frame = 0
+        self.game_over = False
+        self.game_started = False
+
+    def create_pipe(self):
+        return self.pipe_pool.spawn(self.profile.screen_width, self.heights.next())
+
+    def update_pipes(self):
+        self.pipe_timer += 1
+        if self.pipe_timer > PIPE_INTERVAL:
+            self.create_pipe()
+            self.pipe_timer = 0
+
+        bird = self.bird
+        for pipe in self.pipes:
+            pipe.update(PIPE_SPEED)
+                
+            if not pipe.passed and pipe.x + PIPE_WIDTH < bird.x:
+                pipe.passed = True
+                self.score += 1
+
+        if self.bird_hits_pipe():
+            self.game_over = True
+
+        # Pipes leave the screen in spawn order, so only the head can be off it
+        pipes = self.pipes
+        while pipes and pipes[0].x + PIPE_WIDTH < 0:
+            self.pipe_pool.despawn_head()
+
+    def bird_hits_pipe(self):
+        # Broad phase: pipes are in x order, so walk them from the left and
+        # only run the swept test on one whose span meets the bird's this step
+        bird = self.bird
+        left = int(bird.x + HITBOX_INSET)
+        right = left + bird.hitbox_size
+        speed = PIPE_SPEED if self.swept else 0
+        for pipe in self.pipes:
+            x = pipe.x
+            if x >= right:
+                return False  # This pipe and every later one are still ahead
+            if x + speed + PIPE_WIDTH > left:
+                hitbox = bird.hitbox()
+                if not self.swept:
+                    hitbox = (left, hitbox[2], hitbox[2], hitbox[3])
+                if swept_pipe_hit(hitbox, x + speed, x, pipe.height, self.profile):
+                    return True
+        return False
+
+    def flap(self):
+        if not self.game_started and not self.game_over:
+            self.game_started = True
+            self.bird.jump()
+        elif not self.game_over:
+            self.bird.jump()
+
+    def step(self, action=NOOP):
+        """Apply an action and advance one frame. Returns False once the bird is dead."""
+        # The world (and frame, which drives scrolling) freezes on game over
+        if self.game_over:
+            return False
+
+        if action == FLAP:
+            self.flaps.append(self.frame)
+            self.flap()
+
+        if self.game_started and not self.game_over:
+            self.bird.update()
+            self.timer.lap("bird.update")
+            self.update_pipes()
+            self.timer.lap("update_pipes")
+            
+            if (self.bird.y <= 0 or 
+                self.bird.y >= self.bird.floor_y):
+                self.game_over = True
+
+        self.frame += 1
+        return not self.game_over
+
+    def to_replay(self):
+        return Replay(self.seed, self.flaps, self.frame, self.score, physics_constants(self.profile),
+                      REPLAY_VERSION if self.swept else 1)
+
+# Policies (Simulation -> FLAP/NOOP) shared by the bots, benchmarks and tools
+
+def next_pipe(sim):
+    # The nearest pipe the bird hasn't cleared yet, or None; pipes are in spawn order
+    for pipe in sim.pipes:
+        if pipe.x + PIPE_WIDTH >= sim.bird.x:
+            return pipe
+    return None
+
+def gap_chaser(sim):
+    # Flap to start, then whenever the bird has sunk below the centre of the next gap
+    if not sim.game_started:
+        return FLAP
+    pipe = next_pipe(sim)
+    target = sim.profile.screen_height // 2 if pipe is None else pipe.height + sim.profile.pipe_gap // 2
+    return FLAP if sim.bird.y > target and sim.bird.velocity >= 0 else NOOP
+
+def physics_constants(profile=None):
+    # Everything a replay needs to match to reproduce a run (see replay.py)
+    profile = load_profile(profile)
+    bird = Bird(profile)
+    return (bird.gravity, bird.jump_strength, bird.x, bird.size, profile.screen_width, profile.screen_height,
+            profile.ground_height, PIPE_WIDTH, profile.pipe_gap, PIPE_SPEED, PIPE_INTERVAL)
+
+def replay_profile(replay):
+    # The header's physics say which profile recorded a replay
+    for name in available_profiles():
+        if physics_constants(name) == replay.physics:
+            return load_profile(name)
+    raise ValueError("replay was recorded with unknown physics constants")
+
+def run_replay(replay, profile=None):
+    # Re-simulates a replay headlessly, as fast as the CPU allows
+    if profile is None:
+        profile = replay_profile(replay)
+    elif replay.physics != physics_constants(profile):
+        raise ValueError("replay was recorded with different physics constants")
+    sim = Simulation(replay.seed, profile, swept=replay.version >= 2)
+    flaps = set(replay.flaps)
+    while sim.frame < replay.frames and not sim.game_over:
+        sim.step(FLAP if sim.frame in flaps else NOOP)
+    return sim
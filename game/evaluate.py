@@ -0,0 +1,130 @@
+"""Evaluate a bot policy over many seeds in parallel.
+
+    python game/evaluate.py --games 5000
+    python game/evaluate.py --policy mybots:cautious --workers 8 --profile web
+    python game/evaluate.py --games 2000 --scaling
+
+A policy is a callable taking the Simulation (bird, pipes, profile, ...)
+and returning FLAP or NOOP, named as module:function (the current
+directory is importable), or one of the built-ins in POLICIES. Every game
+runs the real Simulation rules; games are fanned out over a process pool
+in chunks, one seed per game.
+"""
+import argparse
+import importlib
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from core import Simulation, available_profiles, gap_chaser, load_profile, seed_arg, FLAP, NOOP
+from timings import percentile
+
+def random_flapper(sim):
+    # Baseline: flaps on about 7% of frames, pseudo-randomly but repeatably per seed
+    return FLAP if hash((sim.seed, sim.frame)) % 100 < 7 else NOOP
+
+POLICIES = {"heuristic": gap_chaser, "random": random_flapper}
+
+def load_policy(spec):
+    if spec in POLICIES:
+        return POLICIES[spec]
+    module_name, _, function = spec.partition(":")
+    if not function:
+        raise ValueError(f"policy must be one of {sorted(POLICIES)} or module:function, got {spec!r}")
+    if os.getcwd() not in sys.path:
+        sys.path.insert(0, os.getcwd())
+    return getattr(importlib.import_module(module_name), function)
+
+def play(policy, seed, profile, max_frames):
+    """Run one game to death or max_frames. Returns (seed, score, frames)."""
+    sim = Simulation(seed, profile)
+    step = sim.step
+    while sim.frame < max_frames and step(policy(sim)):
+        pass
+    return seed, sim.score, sim.frame
+
+_worker = None  # (policy, profile, max_frames), set once per pool process
+
+def init_worker(policy_spec, profile_name, max_frames):
+    global _worker
+    _worker = (load_policy(policy_spec), load_profile(profile_name), max_frames)
+
+def play_seed(seed):
+    policy, profile, max_frames = _worker
+    return play(policy, seed, profile, max_frames)
+
+def evaluate(policy_spec, seeds, profile_name, max_frames, workers, chunksize=None):
+    """Play every seed, in a pool of workers processes (in-process if workers == 1)."""
+    if workers == 1:
+        init_worker(policy_spec, profile_name, max_frames)
+        return [play_seed(seed) for seed in seeds]
+    # A few chunks per worker: amortizes pickling without starving the tail
+    chunksize = chunksize or max(1, math.ceil(len(seeds) / (workers * 8)))
+    with ProcessPoolExecutor(workers, initializer=init_worker,
+                             initargs=(policy_spec, profile_name, max_frames)) as pool:
+        return list(pool.map(play_seed, seeds, chunksize=chunksize))
+
+def report(results, elapsed, workers, max_frames):
+    scores = sorted(score for _, score, _ in results)
+    frames = sorted(frame for _, _, frame in results)
+    games = len(results)
+    mean = sum(scores) / games
+    spread = math.sqrt(sum((s - mean) ** 2 for s in scores) / games)
+    print(f"score:    mean {mean:.2f}  std {spread:.2f}  min {scores[0]}  "
+          + "  ".join(f"p{round(p * 100)} {percentile(scores, p)}" for p in (0.25, 0.5, 0.75, 0.9, 0.99))
+          + f"  max {scores[-1]}")
+    print(f"survival: mean {sum(frames) / games:.0f} frames  median {percentile(frames, 0.5)}  "
+          f"max {frames[-1]}  ({sum(1 for f in frames if f >= max_frames)} games hit the {max_frames}-frame cap)")
+
+    # Score histogram in up to 10 equal-width buckets, from the lowest score up
+    width = max(1, math.ceil((scores[-1] + 1) / 10))
+    counts = {}
+    for score in scores:
+        counts[score // width] = counts.get(score // width, 0) + 1
+    largest = max(counts.values())
+    for bucket in range(scores[0] // width, scores[-1] // width + 1):
+        count = counts.get(bucket, 0)
+        label = f"{bucket * width}-{bucket * width + width - 1}" if width > 1 else str(bucket)
+        print(f"  {label:>9} {count:>7} {'#' * round(40 * count / largest)}")
+
+    steps = sum(frames)
+    print(f"throughput: {games / elapsed:,.0f} games/s, {steps / elapsed:,.0f} steps/s "
+          f"({steps / elapsed / workers:,.0f} per worker) on {workers} worker(s) in {elapsed:.2f}s")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--policy", default="heuristic", help=f"{' or '.join(POLICIES)} or module:function")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--first-seed", type=seed_arg, default=0, help="games use consecutive seeds from here")
+    parser.add_argument("--max-frames", type=int, default=20000, help="stop games that survive this long")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunksize", type=int, help="seeds per pool task (default: ~8 chunks per worker)")
+    parser.add_argument("--profile", choices=available_profiles())
+    parser.add_argument("--scaling", action="store_true", help="time 1, 2, 4, ... --workers workers")
+    args = parser.parse_args()
+
+    load_policy(args.policy)  # Fail fast, before any workers start
+    profile = load_profile(args.profile).name
+    seeds = list(range(args.first_seed, args.first_seed + args.games))
+
+    if args.scaling:
+        counts = sorted({min(args.workers, 2 ** i) for i in range(args.workers.bit_length() + 1)})
+        base = None
+        for workers in counts:
+            start = time.perf_counter()
+            evaluate(args.policy, seeds, profile, args.max_frames, workers, args.chunksize)
+            elapsed = time.perf_counter() - start
+            base = base or elapsed
+            print(f"{workers:>3} workers: {elapsed:6.2f}s  {args.games / elapsed:8,.0f} games/s  "
+                  f"speedup {base / elapsed:5.2f}x  efficiency {base / elapsed / workers:4.0%}")
+        return
+
+    print(f"{args.games} games of {args.policy!r} on the {profile} profile, {args.workers} worker(s)")
+    start = time.perf_counter()
+    results = evaluate(args.policy, seeds, profile, args.max_frames, args.workers, args.chunksize)
+    report(results, time.perf_counter() - start, args.workers, args.max_frames)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""Neuroevolution of small MLP controllers on the batch simulator.
+
+    python game/evolve.py train [--population 200] [--checkpoint evolve.npz] [--watch 10]
+    python game/evolve.py play evolve.npz [--seed 7]
+
+Each genome is the flattened weights of a 4-H-1 tanh network that sees
+the bird's height and velocity and the distance to and height of the
+next gap, and flaps when its output is positive. A generation plays
+every genome on the same fresh seeds, all games stepped together in one
+BatchSimulation, keeps the elite and refills the population with mutated
+copies of the fittest. Training stops once the best genome clears
+--target pipes in every episode.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from batch import BatchSimulation
+from core import available_profiles, load_profile, next_pipe, seed_arg, FLAP, NOOP, PIPE_WIDTH, PIPE_SPEED, PIPE_INTERVAL
+
+INPUTS = 4
+
+def genome_size(hidden):
+    return INPUTS * hidden + hidden + hidden + 1
+
+def unpack(genomes, hidden):
+    # (G, genome_size) -> per-genome W1 (G, 4, H), b1 (G, H), W2 (G, H), b2 (G,)
+    g = len(genomes)
+    w1_end = INPUTS * hidden
+    w1 = genomes[:, :w1_end].reshape(g, INPUTS, hidden)
+    b1 = genomes[:, w1_end:w1_end + hidden]
+    w2 = genomes[:, w1_end + hidden:w1_end + 2 * hidden]
+    b2 = genomes[:, -1]
+    return w1, b1, w2, b2
+
+def decide(params, obs):
+    """Flap decisions for (G, 4) observations, one network per row."""
+    w1, b1, w2, b2 = params
+    hidden = np.tanh(np.einsum("gi,gih->gh", obs, w1) + b1)
+    return (hidden * w2).sum(axis=1) + b2 > 0
+
+def observe(profile, y, velocity, bird_x, pipe_x, pipe_height):
+    # Scaled to roughly [-1, 1]; works on scalars and arrays alike
+    gap_centre = pipe_height + profile.pipe_gap / 2
+    return np.stack([
+        y / profile.screen_height,
+        velocity / 10.0,
+        (pipe_x + PIPE_WIDTH - bird_x) / profile.screen_width,
+        (gap_centre - y) / profile.screen_height,
+    ], axis=-1)
+
+def max_frames_for(profile, pipes):
+    # Long enough for a perfect flier to clear the given number of pipes
+    first = (profile.screen_width - 80) // PIPE_SPEED + PIPE_INTERVAL
+    return first + (pipes + 1) * (PIPE_INTERVAL + 1)
+
+def play_generation(genomes, hidden, seeds, profile, max_frames):
+    """Play every genome on every seed. Returns (G, E) scores and frames survived."""
+    g, e = len(genomes), len(seeds)
+    batch = BatchSimulation(g * e, list(seeds) * g, profile)
+    params = unpack(np.repeat(genomes, e, axis=0), hidden)
+    survived = np.zeros(g * e, dtype=np.int64)
+
+    batch.step(np.full(g * e, FLAP))  # Every game starts with a flap
+    while not batch.done and batch.frame < max_frames:
+        pipe_x, pipe_height = batch.next_pipe()
+        obs = observe(profile, batch.y, batch.velocity, batch.bird.x, pipe_x, pipe_height)
+        batch.step(np.where(decide(params, obs), FLAP, NOOP))
+        survived += ~batch.game_over
+    return batch.score.reshape(g, e), survived.reshape(g, e)
+
+def next_generation(rng, genomes, fitness, elite, sigma):
+    # Elites survive unchanged; everyone else is a mutated copy of a parent
+    # drawn from the top fifth
+    order = np.argsort(-fitness)
+    parents = genomes[order[:max(elite, len(genomes) // 5)]]
+    children = parents[rng.integers(len(parents), size=len(genomes) - elite)]
+    children = children + rng.normal(0, sigma, children.shape)
+    return np.concatenate([genomes[order[:elite]], children])
+
+def save_checkpoint(path, genomes, fitness, generation, hidden, best):
+    np.savez(path, genomes=genomes, fitness=fitness, generation=generation, hidden=hidden, best=best)
+
+class GenomePolicy:
+    """One genome as a scalar policy: Simulation -> FLAP/NOOP (Game autopilot, evaluate.py)."""
+
+    def __init__(self, genome, hidden):
+        self.params = unpack(np.asarray(genome, dtype=np.float64)[None], hidden)
+
+    def __call__(self, sim):
+        if not sim.game_started:
+            return FLAP
+        pipe = next_pipe(sim)
+        if pipe is None:  # Same placeholder as BatchSimulation.next_pipe()
+            pipe_x, pipe_height = sim.profile.screen_width, (sim.profile.ground_y - sim.profile.pipe_gap) // 2
+        else:
+            pipe_x, pipe_height = pipe.x, pipe.height
+        obs = observe(sim.profile, sim.bird.y, sim.bird.velocity, sim.bird.x, pipe_x, pipe_height)
+        return FLAP if decide(self.params, obs[None])[0] else NOOP
+
+def watch(genome, hidden, seed, profile, speed=1.0):
+    # Flies one game with the genome through the normal renderer; returns
+    # False if the window was closed
+    from main import Game, FPS
+    game = Game(seed=seed, profile=profile, autopilot=GenomePolicy(genome, hidden))
+    while not game.sim.game_over:
+        if not game.handle_events():
+            return False
+        game.step()
+        game.present()
+        game.clock.tick(FPS * speed)
+    return True
+
+def load_checkpoint(path):
+    data = np.load(path)
+    return data["genomes"], data["fitness"], int(data["generation"]), int(data["hidden"]), data["best"]
+
+def train(args):
+    profile = load_profile(args.profile)
+    rng = np.random.default_rng(args.seed)
+    if args.resume and os.path.exists(args.checkpoint):
+        genomes, _, generation, hidden, best = load_checkpoint(args.checkpoint)
+        print(f"resumed {args.checkpoint} at generation {generation}")
+    else:
+        hidden = args.hidden
+        genomes = rng.normal(0, 1, (args.population, genome_size(hidden)))
+        generation = 0
+        best = genomes[0]
+    max_frames = max_frames_for(profile, args.target)
+    fitness = np.zeros(len(genomes))
+
+    start = time.perf_counter()
+    while generation < args.generations:
+        seeds = rng.integers(2**32, size=args.episodes).tolist()
+        scores, survived = play_generation(genomes, hidden, seeds, profile, max_frames)
+        # Frames survived rank genomes that never pass a pipe; pipes dominate after that
+        fitness = (survived + 100 * scores).mean(axis=1)
+        leader = int(np.argmax(fitness))
+        best = genomes[leader].copy()
+        generation += 1
+        print(f"gen {generation:>4}: best {scores[leader].min():>4} pipes (mean {scores.mean():6.2f}), "
+              f"{time.perf_counter() - start:6.1f}s")
+
+        if scores[leader].min() >= args.target:
+            print(f"cleared {args.target} pipes in all {args.episodes} episodes")
+            save_checkpoint(args.checkpoint, genomes, fitness, generation, hidden, best)
+            break
+        if generation % args.save_every == 0:
+            save_checkpoint(args.checkpoint, genomes, fitness, generation, hidden, best)
+        if args.watch and generation % args.watch == 0:
+            if not watch(best, hidden, int(seeds[0]), profile, args.speed):
+                args.watch = 0  # Window closed: keep training without it
+        genomes = next_generation(rng, genomes, fitness, args.elite, args.sigma)
+    else:
+        save_checkpoint(args.checkpoint, genomes, fitness, generation, hidden, best)
+    print(f"saved {args.checkpoint}")
+
+def play(args):
+    from main import Game
+    _, _, generation, hidden, best = load_checkpoint(args.checkpoint)
+    print(f"best genome of generation {generation}; R or click restarts")
+    game = Game(seed=args.seed, profile=args.profile, autopilot=GenomePolicy(best, hidden), speed=args.speed)
+    asyncio.run(game.run())
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    train_parser = commands.add_parser("train")
+    train_parser.add_argument("--population", type=int, default=200)
+    train_parser.add_argument("--episodes", type=int, default=2, help="seeds each genome plays per generation")
+    train_parser.add_argument("--hidden", type=int, default=8)
+    train_parser.add_argument("--generations", type=int, default=500)
+    train_parser.add_argument("--elite", type=int, default=10)
+    train_parser.add_argument("--sigma", type=float, default=0.2, help="mutation standard deviation")
+    train_parser.add_argument("--target", type=int, default=100, help="pipes to clear before stopping")
+    train_parser.add_argument("--seed", type=int, default=0)
+    train_parser.add_argument("--checkpoint", default="evolve.npz")
+    train_parser.add_argument("--save-every", type=int, default=10)
+    train_parser.add_argument("--resume", action="store_true", help="continue from --checkpoint")
+    train_parser.add_argument("--watch", type=int, default=0, metavar="N",
+                              help="fly the best genome on screen every N generations")
+    play_parser = commands.add_parser("play", help="watch a checkpoint's best genome")
+    play_parser.add_argument("checkpoint")
+    play_parser.add_argument("--seed", type=seed_arg)
+    for sub in (train_parser, play_parser):
+        sub.add_argument("--profile", choices=available_profiles())
+        sub.add_argument("--speed", type=float, default=1.0, help="playback speed multiplier")
+    args = parser.parse_args()
+
+    if args.command == "train":
+        train(args)
+    else:
+        play(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""Export a replay as numbered images, an animated GIF or a video, faster than real time.
+
+    python game/export.py replays/FILE.fbr frames/                     # frames/frame_000000.png, ...
+    python game/export.py replays/FILE.fbr frames/ --format bmp        # faster to write, much larger
+    python game/export.py replays/FILE.fbr run.gif --scale 0.5         # needs ffmpeg on PATH
+    python game/export.py replays/FILE.fbr run.mp4 --workers 8         # needs ffmpeg on PATH
+
+Frames are drawn offscreen by the real Game renderer, one image per
+simulation step, so an export matches --replay frame for frame. The
+frame range is cut into one contiguous chunk per worker process. Each
+worker fast-forwards its own Game to the start of its chunk without
+drawing, then streams its frames straight to disk: numbered images, or
+raw RGB piped into an ffmpeg process writing that chunk's segment.
+Memory stays flat however long the run. Segments are joined without
+re-encoding; a GIF is joined from lossless segments and then encoded in
+two ffmpeg passes that share one palette. Drawing a frame takes well
+under a millisecond, so PNG compression is usually what bounds an image
+export (see --format).
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+from main import Game, FPS, load_profile, replay_profile
+from replay import Replay
+
+FRAME_NAME = "frame_%06d"
+# Per-chunk segment encoding: final codec for video, lossless FFV1 for a GIF's intermediate
+SEGMENT_ARGS = {
+    "video": ["-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-pix_fmt", "yuv420p"],  # yuv420p needs even sizes
+    "gif": ["-c:v", "ffv1"],
+}
+
+def output_kind(path):
+    # A directory (or a path without an extension) gets numbered images; anything else is ffmpeg's business
+    ext = os.path.splitext(path)[1].lower()
+    if os.path.isdir(path) or not ext:
+        return "images"
+    return "gif" if ext == ".gif" else "video"
+
+def ffmpeg(*args):
+    subprocess.run(["ffmpeg", "-loglevel", "error", "-y", *map(str, args)], check=True)
+
+def encoder_command(size, fps, path, kind):
+    # Raw RGB frames on stdin -> one segment file
+    return ["ffmpeg", "-loglevel", "error", "-y",
+            "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{size[0]}x{size[1]}", "-r", str(fps), "-i", "-",
+            *SEGMENT_ARGS[kind], path]
+
+def export_size(profile, scale):
+    if scale == 1:
+        return (profile.screen_width, profile.screen_height)
+    return (max(1, round(profile.screen_width * scale)), max(1, round(profile.screen_height * scale)))
+
+def render_chunk(replay_path, frames, first_index, size, frame_pattern=None, encoder=None):
+    """Draw the frames in range frames (frame n is the state after n steps) at size.
+
+    Saves them to frame_pattern % (first_index + i), or pipes them as raw
+    RGB into the encoder command. Returns the number of frames written.
+    """
+    game = Game(replay=Replay.load(replay_path), offscreen=True)
+    scaled = None if size == game.screen.get_size() else pygame.Surface(size)
+    process = None
+    if encoder is not None:
+        process = subprocess.Popen(encoder, stdin=subprocess.PIPE)
+
+    # The recording stops at frame replay.frames, dead or not (a run saved
+    # mid-game never reaches game over), so frames past it repeat that one
+    last = game.replay.frames
+    for i, frame in enumerate(frames):
+        while game.sim.frame < min(frame, last) and not game.sim.game_over:
+            game.step()
+        game.draw()
+        surface = game.screen
+        if scaled is not None:
+            surface = pygame.transform.smoothscale(game.screen, size, scaled)
+        if process is not None:
+            process.stdin.write(pygame.image.tobytes(surface, "RGB"))
+        else:
+            pygame.image.save(surface, frame_pattern % (first_index + i))
+
+    if process is not None:
+        process.stdin.close()
+        if process.wait():
+            raise RuntimeError(f"ffmpeg failed writing {encoder[-1]}")
+    return len(frames)
+
+def join_segments(segments, output):
+    listing = os.path.join(os.path.dirname(segments[0]), "segments.txt")
+    with open(listing, "w") as f:
+        f.writelines(f"file '{path}'\n" for path in segments)
+    ffmpeg("-f", "concat", "-safe", "0", "-i", listing, "-c", "copy", output)
+
+def encode_gif(video, output):
+    # Two passes over the lossless video; palettegen only keeps a colour
+    # histogram, so neither pass holds the frames
+    palette = os.path.join(os.path.dirname(video), "palette.png")
+    ffmpeg("-i", video, "-vf", "palettegen", palette)
+    ffmpeg("-i", video, "-i", palette, "-lavfi", "paletteuse", output)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("replay", help=".fbr file")
+    parser.add_argument("output", help="directory for numbered images, or a .gif / video file (needs ffmpeg)")
+    parser.add_argument("--format", choices=("png", "bmp", "tga"), default="png",
+                        help="image format for a directory (bmp and tga write ~8x faster, ~70x larger)")
+    parser.add_argument("--start", type=int, default=0, help="first simulation frame")
+    parser.add_argument("--end", type=int, help="stop before this frame (default: end of run plus --hold)")
+    parser.add_argument("--hold", type=float, default=1.0, help="seconds to hold the last frame of the run")
+    parser.add_argument("--every", type=int, help="keep every Nth frame (default: 2 for GIFs, else 1)")
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    kind = output_kind(args.output)
+    if kind != "images" and shutil.which("ffmpeg") is None:
+        parser.error(f"{kind} output needs ffmpeg on PATH; export to a directory for images")
+    replay = Replay.load(args.replay)
+    size = export_size(load_profile(replay_profile(replay)), args.scale)
+    every = args.every or (2 if kind == "gif" else 1)
+    end = args.end if args.end is not None else replay.frames + 1 + round(args.hold * FPS)
+    frames = range(args.start, end, every)
+    if not frames:
+        parser.error(f"no frames in [{args.start}, {end})")
+    fps = FPS / every
+    workers = max(1, min(args.workers, len(frames)))
+
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp:
+        jobs = []
+        bounds = [i * len(frames) // workers for i in range(workers + 1)]
+        for i, (a, b) in enumerate(zip(bounds, bounds[1:])):
+            if kind == "images":
+                os.makedirs(args.output, exist_ok=True)
+                pattern = os.path.join(args.output, f"{FRAME_NAME}.{args.format}")
+                jobs.append((args.replay, frames[a:b], a, size, pattern, None))
+            else:
+                ext = os.path.splitext(args.output)[1] if kind == "video" else ".mkv"
+                segment = os.path.join(tmp, f"segment{i:03d}{ext}")
+                jobs.append((args.replay, frames[a:b], a, size, None, encoder_command(size, fps, segment, kind)))
+        if workers == 1:
+            written = [render_chunk(*jobs[0])]
+        else:
+            with ProcessPoolExecutor(workers) as pool:
+                written = list(pool.map(render_chunk, *zip(*jobs)))
+
+        segments = [job[5][-1] for job in jobs if job[5] is not None]
+        if kind == "video":
+            join_segments(segments, args.output)
+        elif kind == "gif":
+            joined = os.path.join(tmp, "joined.mkv")
+            join_segments(segments, joined)
+            encode_gif(joined, args.output)
+    elapsed = time.perf_counter() - start
+
+    count = sum(written)
+    played = len(frames) * every / FPS
+    print(f"wrote {count} frames to {args.output} ({played:.1f}s of play at {fps:g} fps) "
+          f"in {elapsed:.2f}s with {workers} worker(s): {count / elapsed:,.0f} frames/sec, "
+          f"{played / elapsed:.1f}x real time")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,35 @@
 import pygame
+import argparse
 import random
-import sys
+import os
 import asyncio
+import math
+import time
+from collections import OrderedDict, deque
 
-# Global constants (Safe to define before init)
-SCREEN_WIDTH = 400
-SCREEN_HEIGHT = 600
-GROUND_HEIGHT = 100
-PIPE_WIDTH = 50
-PIPE_GAP = 150
-BIRD_SIZE = 45   # Scaled down for 400x600
-FPS = 60
+try:
+    import numpy as np
+except ImportError:
+    np = None  # The browser build has no NumPy; ParallaxLayers falls back to lists
+
+from core import (Profile, Bird, Pipe, PipeHeights, PipePool, Simulation, available_profiles, default_profile_name,
+                  load_profile, random_pipe_height, new_seed, check_seed, seed_arg, narrow_window, swept_pipe_hit,
+                  pipe_capacity, next_pipe, gap_chaser, physics_constants, replay_profile, run_replay,
+                  SEED_LIMIT, PIPE_WIDTH, PIPE_SPEED, PIPE_INTERVAL, HITBOX_INSET, NOOP, FLAP, PROFILE_DIR)
+from replay import Replay
+from timings import FrameTimer, LatencyLog, NULL_TIMER
+
+# Rendering, input and the window loop on top of the pygame-free rules in
+# core.py, which are re-exported here so `from main import Simulation` keeps
+# working.
+FPS = 60               # Physics steps per second (fixed, independent of rendering)
+MAX_RENDER_FPS = 240
+MAX_STEPS_PER_FRAME = 5  # Frame-skip cap: beyond this, drop time instead of spiralling
+
+# Player inputs, whichever device they come from
+INPUT_FLAP = "flap"        # Flap; ignored on the game-over screen
+INPUT_RESTART = "restart"  # New game; only on the game-over screen
+INPUT_TAP = "tap"          # Whichever of the two fits: clicks and touches
 
 # Colors
 WHITE = (255, 255, 255)
@@ -23,313 +42,634 @@ BIRD_BELLY = (222, 184, 135) # Light shade for belly
 BIRD_BEAK = (255, 165, 0)    # Orange beak
 GROUND_BROWN = (222, 184, 135)
 GROUND_LINE = (139, 69, 19)
+COLORKEY = (255, 0, 255)  # Transparent colour in cached opaque surfaces
 
-class Bird:
-    def __init__(self):
-        self.x = 80
-        self.y = SCREEN_HEIGHT // 2
-        self.velocity = 0
-        self.gravity = 0.5
-        self.jump_strength = -8
-        self.size = BIRD_SIZE
-        self.rotation = 0
-        
-    def update(self):
-        self.velocity += self.gravity
-        self.y += self.velocity
-        
-        # Rotation based on velocity
-        if self.velocity < 0:
-            self.rotation = 25
-        else:
-            self.rotation = max(-90, self.rotation - 3)
-        
-        if self.y < 0:
-            self.y = 0
-            self.velocity = 0
-        elif self.y > SCREEN_HEIGHT - GROUND_HEIGHT - self.size:
-            self.y = SCREEN_HEIGHT - GROUND_HEIGHT - self.size
-    
-    def jump(self):
-        self.velocity = self.jump_strength
-        self.rotation = 45
+PIPE_CAP_HEIGHT = 25
+GROUND_TILE = 20      # Spacing of the diagonal ground stripes
+GROUND_OVERHANG = 5   # Rows of the grass line drawn above the ground
+ROTATION_STEP = 5  # Degrees between cached bird rotations
+_bird_sprites = {}
+_pipe_atlases = {}
+_ground_strips = {}
+_cloud_sprites = {}
+
+# Cloud shapes as (dx, dy, radius) puffs around the cloud's centre
+CLOUD_SHAPES = (
+    ((0, 0, 30), (-20, 10, 25), (20, 10, 25)),
+    ((0, 2, 26), (-24, 10, 20), (22, 8, 22), (4, 14, 22)),
+    ((-10, 4, 24), (14, 0, 28), (-30, 14, 18), (34, 14, 18)),
+)
+
+def paint_bird(surface, center_x, center_y, size):
+    radius = size // 2
+
+    # Tail Feathers (Black) - Drawn first so they are behind body
+    pygame.draw.polygon(surface, BLACK, [
+        (center_x - radius + 5, center_y),
+        (center_x - radius - 12, center_y - 10),
+        (center_x - radius - 12, center_y + 10)
+    ])
+
+    # Body (Red)
+    pygame.draw.circle(surface, BIRD_RED, (center_x, center_y), radius)
+    # Outline
+    pygame.draw.circle(surface, BLACK, (center_x, center_y), radius, 3)
+
+    # Belly (Light patch at bottom)
+    pygame.draw.circle(surface, BIRD_BELLY, (center_x, center_y + 10), radius - 8)
+
+    # Eyes (White with Black pupils)
+    eye_radius = 10
+    left_eye_pos = (center_x + 2, center_y - 12)
+    right_eye_pos = (center_x + 18, center_y - 12)
     
-    def get_rect(self):
-        # Slightly broken hitbox for gameplay forgiveness
-        # Hitbox is smaller than the visual bird
-        return pygame.Rect(self.x + 8, self.y + 8, self.size - 16, self.size - 16)
+    # Left Eye
+    pygame.draw.circle(surface, WHITE, left_eye_pos, eye_radius)
+    pygame.draw.circle(surface, BLACK, left_eye_pos, eye_radius, 2) # Outline
+    pygame.draw.circle(surface, BLACK, (left_eye_pos[0] + 3, left_eye_pos[1]), 4) # Pupil
     
-    def draw(self, screen):
-        center_x = int(self.x + self.size//2)
-        center_y = int(self.y + self.size//2)
-        radius = self.size // 2
-
-        # Tail Feathers (Black) - Drawn first so they are behind body
-        pygame.draw.polygon(screen, BLACK, [
-            (center_x - radius + 5, center_y),
-            (center_x - radius - 12, center_y - 10),
-            (center_x - radius - 12, center_y + 10)
-        ])
-
-        # Body (Red)
-        pygame.draw.circle(screen, BIRD_RED, (center_x, center_y), radius)
-        # Outline
-        pygame.draw.circle(screen, BLACK, (center_x, center_y), radius, 3)
-
-        # Belly (Light patch at bottom)
-        pygame.draw.circle(screen, BIRD_BELLY, (center_x, center_y + 10), radius - 8)
-
-        # Eyes (White with Black pupils)
-        eye_radius = 10
-        left_eye_pos = (center_x + 2, center_y - 12)
-        right_eye_pos = (center_x + 18, center_y - 12)
-        
-        # Left Eye
-        pygame.draw.circle(screen, WHITE, left_eye_pos, eye_radius)
-        pygame.draw.circle(screen, BLACK, left_eye_pos, eye_radius, 2) # Outline
-        pygame.draw.circle(screen, BLACK, (left_eye_pos[0] + 3, left_eye_pos[1]), 4) # Pupil
-        
-        # Right Eye
-        pygame.draw.circle(screen, WHITE, right_eye_pos, eye_radius)
-        pygame.draw.circle(screen, BLACK, right_eye_pos, eye_radius, 2) # Outline
-        pygame.draw.circle(screen, BLACK, (right_eye_pos[0] + 3, right_eye_pos[1]), 4) # Pupil
-
-        # Eyebrows (The angry look - clear V shape)
-        eyebrow_thick = 4 
-        # V shape meeting in middle
-        pygame.draw.line(screen, BLACK, (center_x - 6, center_y - 20), (center_x + 10, center_y - 6), eyebrow_thick)
-        pygame.draw.line(screen, BLACK, (center_x + 10, center_y - 6), (center_x + 26, center_y - 20), eyebrow_thick)
-
-        # Beak (Yellow/Orange Triangle)
-        beak_points = [
-            (center_x + 10, center_y + 2),   # Top center
-            (center_x + 28, center_y + 10),  # Tip
-            (center_x + 10, center_y + 18)   # Bottom center
-        ]
-        pygame.draw.polygon(screen, BIRD_BEAK, beak_points)
-        pygame.draw.polygon(screen, BLACK, beak_points, 2)
-
-class Pipe:
-    def __init__(self, x):
-        self.x = x
-        self.height = random.randint(50, SCREEN_HEIGHT - GROUND_HEIGHT - PIPE_GAP - 50)
-        self.top_rect = pygame.Rect(x, 0, PIPE_WIDTH, self.height)
-        self.bottom_rect = pygame.Rect(x, self.height + PIPE_GAP, PIPE_WIDTH, SCREEN_HEIGHT - self.height - PIPE_GAP - GROUND_HEIGHT)
-        self.passed = False
-        
-    def update(self, speed):
-        self.x -= speed
-        self.top_rect.x = self.x
-        self.bottom_rect.x = self.x
-        
-    def draw(self, screen):
-        # Top Pipe with 3D effect
-        pygame.draw.rect(screen, PIPE_GREEN, self.top_rect)
-        pygame.draw.rect(screen, PIPE_DARK_GREEN, self.top_rect, 2)
-        
-        cap_height = 25
-        # Top Cap
-        pygame.draw.rect(screen, PIPE_GREEN, (self.x - 4, self.height - cap_height, PIPE_WIDTH + 8, cap_height))
-        pygame.draw.rect(screen, PIPE_DARK_GREEN, (self.x - 4, self.height - cap_height, PIPE_WIDTH + 8, cap_height), 2)
-
-        # Bottom Pipe
-        pygame.draw.rect(screen, PIPE_GREEN, self.bottom_rect)
-        pygame.draw.rect(screen, PIPE_DARK_GREEN, self.bottom_rect, 2)
-        
-        # Bottom Cap
-        pygame.draw.rect(screen, PIPE_GREEN, (self.x - 4, self.height + PIPE_GAP, PIPE_WIDTH + 8, cap_height))
-        pygame.draw.rect(screen, PIPE_DARK_GREEN, (self.x - 4, self.height + PIPE_GAP, PIPE_WIDTH + 8, cap_height), 2)
-        
-        # Highlights
-        pygame.draw.line(screen, (100, 200, 100), (self.x + 10, 0), (self.x + 10, self.height - cap_height), 3)
-        pygame.draw.line(screen, (100, 200, 100), (self.x + 10, self.height + PIPE_GAP + cap_height), (self.x + 10, SCREEN_HEIGHT), 3)
+    # Right Eye
+    pygame.draw.circle(surface, WHITE, right_eye_pos, eye_radius)
+    pygame.draw.circle(surface, BLACK, right_eye_pos, eye_radius, 2) # Outline
+    pygame.draw.circle(surface, BLACK, (right_eye_pos[0] + 3, right_eye_pos[1]), 4) # Pupil
 
-    def collides_with(self, bird):
-        bird_rect = bird.get_rect()
-        return bird_rect.colliderect(self.top_rect) or bird_rect.colliderect(self.bottom_rect)
+    # Eyebrows (The angry look - clear V shape)
+    eyebrow_thick = 4 
+    # V shape meeting in middle
+    pygame.draw.line(surface, BLACK, (center_x - 6, center_y - 20), (center_x + 10, center_y - 6), eyebrow_thick)
+    pygame.draw.line(surface, BLACK, (center_x + 10, center_y - 6), (center_x + 26, center_y - 20), eyebrow_thick)
+
+    # Beak (Yellow/Orange Triangle)
+    beak_points = [
+        (center_x + 10, center_y + 2),   # Top center
+        (center_x + 28, center_y + 10),  # Tip
+        (center_x + 10, center_y + 18)   # Bottom center
+    ]
+    pygame.draw.polygon(surface, BIRD_BEAK, beak_points)
+    pygame.draw.polygon(surface, BLACK, beak_points, 2)
+
+def get_bird_sprite(size, rotation):
+    # The bird is painted once per size and pre-rotated in ROTATION_STEP
+    # increments over the -90..45 range Bird.update() produces. Returns the
+    # sprite plus the offset that puts its centre on the bird's centre.
+    sprites = _bird_sprites.get(size)
+    if sprites is None:
+        sprites = _bird_sprites[size] = build_bird_sprites(size)
+    angle = max(-90, min(45, round(rotation / ROTATION_STEP) * ROTATION_STEP))
+    return sprites[angle]
+
+def draw_bird(screen, bird, y=None):
+    # y overrides the position, e.g. when interpolating between steps
+    if y is None:
+        y = bird.y
+    sprite, dx, dy = get_bird_sprite(bird.size, bird.rotation)
+    return screen.blit(sprite, (int(bird.x + bird.size//2) + dx, int(y + bird.size//2) + dy))
+
+def build_bird_sprites(size):
+    # Tail, beak, eyes and brows stick out past the body circle
+    half = max(size // 2 + 12, 28, 22) + 4
+    base = pygame.Surface((half * 2, half * 2), pygame.SRCALPHA)
+    paint_bird(base, half, half, size)
+
+    sprites = {}
+    for angle in range(-90, 46, ROTATION_STEP):
+        sprite = prepare_surface(pygame.transform.rotate(base, angle))
+        sprites[angle] = (sprite, -(sprite.get_width() // 2), -(sprite.get_height() // 2))
+    return sprites
+
+def prepare_surface(surface, alpha=True):
+    # Match the display's pixel format when there is one (much faster blits);
+    # offscreen use without a display keeps the surface as-is
+    if pygame.display.get_surface() is None:
+        return surface
+    return surface.convert_alpha() if alpha else surface.convert()
+
+class PipeAtlas:
+    # Every pipe shares width, colours and cap geometry, so the pieces are
+    # rendered once per profile and pipes are composed by blitting them
+    def __init__(self, profile):
+        ground_y = profile.ground_y
+        height = profile.screen_height
+
+        # Full-height body column. Its outline supplies the top pipe's upper
+        # edge and the bottom pipe's lower edge; the rest is hidden by caps.
+        # The highlight runs past the ground, as the old per-rect drawing did.
+        body = pygame.Surface((PIPE_WIDTH, height))
+        body.fill(COLORKEY)
+        pygame.draw.rect(body, PIPE_GREEN, (0, 0, PIPE_WIDTH, ground_y))
+        pygame.draw.rect(body, PIPE_DARK_GREEN, (0, 0, PIPE_WIDTH, ground_y), 2)
+        pygame.draw.line(body, (100, 200, 100), (10, 0), (10, height), 3)
+        self.body = prepare_surface(body, alpha=False)
+        self.body.set_colorkey(COLORKEY, pygame.RLEACCEL)
+
+        cap = pygame.Surface((PIPE_WIDTH + 8, PIPE_CAP_HEIGHT))
+        cap.fill(PIPE_GREEN)
+        pygame.draw.rect(cap, PIPE_DARK_GREEN, cap.get_rect(), 2)
+        self.cap = prepare_surface(cap, alpha=False)
+
+def get_pipe_atlas(profile):
+    atlas = _pipe_atlases.get(profile.name)
+    if atlas is None:
+        atlas = _pipe_atlases[profile.name] = PipeAtlas(profile)
+    return atlas
+
+def draw_pipe(screen, pipe, x=None):
+    # Four blits from the shared atlas: body column + cap for each half
+    if x is None:
+        x = pipe.x
+    x = int(x)
+    atlas = get_pipe_atlas(pipe.profile)
+    bottom_y = pipe.height + pipe.profile.pipe_gap
+    screen.blit(atlas.body, (x, 0), (0, 0, PIPE_WIDTH, pipe.height))
+    screen.blit(atlas.cap, (x - 4, pipe.height - PIPE_CAP_HEIGHT))
+    screen.blit(atlas.body, (x, bottom_y), (0, bottom_y, PIPE_WIDTH, pipe.profile.screen_height - bottom_y))
+    screen.blit(atlas.cap, (x - 4, bottom_y))
+
+def get_ground_strip(profile):
+    # Ground, grass line and diagonal stripes pre-rendered one tile wider than
+    # the screen, so scrolling is a single blit at an offset in [-GROUND_TILE, 0)
+    strip = _ground_strips.get(profile.name)
+    if strip is None:
+        width = profile.screen_width + GROUND_TILE
+        top = GROUND_OVERHANG
+        ground_height = profile.ground_height
+        strip = pygame.Surface((width, ground_height + top))
+        strip.fill(COLORKEY)
+        pygame.draw.rect(strip, GROUND_BROWN, (0, top, width, ground_height))
+        pygame.draw.line(strip, (100, 200, 100), (0, top), (width, top), 10)
+        for i in range(0, width + GROUND_TILE, GROUND_TILE):
+            pygame.draw.line(strip, GROUND_LINE, (i, top), (i - 10, top + ground_height), 2)
+        strip = _ground_strips[profile.name] = prepare_surface(strip, alpha=False)
+        strip.set_colorkey(COLORKEY, pygame.RLEACCEL)
+    return strip
+
+def get_cloud_sprite(shape, depth):
+    # Farther clouds (smaller depth) are smaller and fade towards the sky
+    key = (shape, round(depth, 3))
+    sprite = _cloud_sprites.get(key)
+    if sprite is None:
+        scale = 0.5 + 0.5 * depth
+        puffs = [(dx * scale, dy * scale, r * scale) for dx, dy, r in CLOUD_SHAPES[shape]]
+        left = min(dx - r for dx, _, r in puffs)
+        top = min(dy - r for _, dy, r in puffs)
+        width = int(max(dx + r for dx, _, r in puffs) - left) + 1
+        height = int(max(dy + r for _, dy, r in puffs) - top) + 1
+        color = [round(sky + (white - sky) * (0.4 + 0.6 * depth)) for sky, white in zip(SKY_BLUE, WHITE)]
+        sprite = pygame.Surface((width, height))
+        sprite.fill(COLORKEY)
+        for dx, dy, r in puffs:
+            pygame.draw.circle(sprite, color, (int(dx - left), int(dy - top)), int(r))
+        sprite = _cloud_sprites[key] = prepare_surface(sprite, alpha=False)
+        sprite.set_colorkey(COLORKEY, pygame.RLEACCEL)
+    return sprite
+
+class ParallaxLayers:
+    """Background clouds in packed arrays, placed in closed form from a frame count.
+
+    Every cloud has a start x, a y, a speed in pixels per step and a
+    sprite. Its x at any time t (in steps) is x0 - speed * t wrapped around a
+    period one sprite wider than the screen on each side, so nothing is
+    updated per step and nothing random happens after setup. The profile
+    sets how many layers there are and how many clouds each holds; farther
+    layers draw first, smaller, paler and slower.
+    """
+
+    def __init__(self, profile, rng):
+        layers = max(1, profile.cloud_layers)
+        depths = [(layer + 1) / layers for layer in range(layers)]  # 1 is the front layer
+        shapes = len(CLOUD_SHAPES)
+        self.sprites = [get_cloud_sprite(shape, depth) for depth in depths for shape in range(shapes)]
+        self.margin = max(sprite.get_width() for sprite in self.sprites)
+        self.period = profile.screen_width + 2 * self.margin
+
+        x0, speed, self.y, index = [], [], [], []
+        for layer, depth in enumerate(depths):
+            for _ in range(profile.cloud_density):
+                x0.append(rng.uniform(0, self.period))
+                speed.append(rng.uniform(0.5, 1.5) * depth)
+                self.y.append(rng.randint(10, int(profile.ground_y * 0.4)))
+                index.append(layer * shapes + rng.randrange(shapes))
+        self.x0 = np.array(x0) if np is not None else x0
+        self.speed = np.array(speed) if np is not None else speed
+        self.cloud_sprites = [self.sprites[i] for i in index]  # Sprite of each cloud, for blits()
+
+        # Dirty-rect mode repaints the whole band the clouds can cover
+        top = min(self.y, default=0)
+        bottom = max((y + sprite.get_height() for y, sprite in zip(self.y, self.cloud_sprites)), default=0)
+        self.band = pygame.Rect(0, top, profile.screen_width, bottom - top)
+
+    def positions(self, t):
+        # x of every cloud at time t, in one pass over the arrays
+        if np is not None:
+            return ((self.x0 - self.speed * t) % self.period - self.margin).astype(np.int32).tolist()
+        period, margin = self.period, self.margin
+        return [int((x - v * t) % period - margin) for x, v in zip(self.x0, self.speed)]
+
+    def draw(self, screen, t):
+        screen.blits(zip(self.cloud_sprites, zip(self.positions(t), self.y)), doreturn=False)
+        return [self.band]
+
+class TextCache:
+    # Rendered text keyed by (font, text, colour), least recently used evicted
+    # first. Font rasterization is one of the most expensive calls under WASM.
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self.surfaces = OrderedDict()
+
+    def render(self, font, text, color):
+        key = (font, text, color)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = self.surfaces[key] = prepare_surface(font.render(text, True, color))
+            if len(self.surfaces) > self.capacity:
+                self.surfaces.popitem(last=False)
+        else:
+            self.surfaces.move_to_end(key)
+        return surface
+
+    def blit_number(self, screen, font, number, color, pos):
+        # Composed from cached per-digit glyphs, so a new score never hits the font
+        x, y = pos
+        height = 0
+        for digit in str(number):
+            glyph = self.render(font, digit, color)
+            screen.blit(glyph, (x, y))
+            x += glyph.get_width()
+            height = max(height, glyph.get_height())
+        return pygame.Rect(pos[0], y, x - pos[0], height)
+
+def input_action(event):
+    """The input a pygame event stands for, or None."""
+    if event.type == pygame.KEYDOWN:
+        if event.key == pygame.K_SPACE:
+            return INPUT_FLAP
+        if event.key == pygame.K_r:
+            return INPUT_RESTART
+    elif event.type == pygame.FINGERDOWN:
+        return INPUT_TAP
+    elif event.type == pygame.MOUSEBUTTONDOWN and not getattr(event, "touch", False):
+        # SDL also reports each touch as a click; the FINGERDOWN already counted it
+        return INPUT_TAP
+    return None
+
+class InputQueue:
+    """Flaps waiting for a physics step, stamped with when they were read.
+
+    Game.run() hands each flap to the step whose time window contains its
+    stamp, and runs the step in progress early for a flap that lands in
+    it, so the flap reaches the screen in the frame that read it. Steps
+    stay whole frames, so replays record exactly what was simulated.
+    Stamps of applied flaps are kept until the next presented frame to
+    log tap-to-photon latency.
+    """
 
-class Game:
     def __init__(self):
+        self.flaps = deque()
+        self.applied = []
+        self.latency = LatencyLog()
+
+    def push(self, stamp):
+        self.flaps.append(stamp)
+
+    def take(self, window_end):
+        # True if a flap was read before window_end; several in one window are one flap
+        flaps = self.flaps
+        if not flaps or flaps[0] >= window_end:
+            return False
+        while flaps and flaps[0] < window_end:
+            self.applied.append(flaps.popleft())
+        return True
+
+    def presented(self, now):
+        for stamp in self.applied:
+            self.latency.record(now - stamp)
+        self.applied.clear()
+
+    def clear(self):
+        self.flaps.clear()
+        self.applied.clear()
+
+def init_pygame(display=True):
+    # Only what Game uses: pygame.init() would also bring up audio, joysticks
+    # and the rest, which costs startup time in every window and worker
+    if display:
+        pygame.display.init()
+    pygame.font.init()
+
+class Game:
+    def __init__(self, seed=None, dirty_rects=False, replay=None, speed=1.0, record_dir=None, profile=None,
+                 timings=False, autopilot=None, offscreen=False):
         # Initialize Pygame here, not globally, to be safer for headless builds
         try:
-            pygame.init()
-            pygame.font.init()
+            init_pygame(display=not offscreen)
         except:
             pass # Handle potential headless issues gracefully
-            
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("Flappy Bird - By Yuvraj Chopra")
+
+        # A replay plays back with the profile that recorded it
+        if replay is not None and profile is None:
+            profile = replay_profile(replay)
+        self.profile = load_profile(profile)
+
+        # Offscreen games draw into a plain surface and never open a window
+        size = (self.profile.screen_width, self.profile.screen_height)
+        if offscreen:
+            self.screen = pygame.Surface(size)
+        else:
+            self.screen = pygame.display.set_mode(size)
+            pygame.display.set_caption("Flappy Bird - By Yuvraj Chopra")
         self.clock = pygame.time.Clock()
         self.font = pygame.font.Font(None, 40)
         self.score_font = pygame.font.Font(None, 60)
+        self.text = TextCache()
         
-        self.clouds = []
-        for i in range(5):
-             self.clouds.append({
-                 'x': random.randint(0, SCREEN_WIDTH),
-                 'y': random.randint(20, 200),
-                 'speed': random.uniform(0.5, 1.5)
-             })
-             
-        self.reset_game()
-        
+        # Playback drives the bird from a recorded replay instead of input,
+        # at speed times real time; record_dir saves every finished game.
+        # An autopilot (a policy: Simulation -> FLAP/NOOP) flies it instead.
+        self.replay = replay
+        self.autopilot = autopilot
+        self.replay_flaps = set(replay.flaps) if replay else set()
+        self.speed = speed
+        self.record_dir = record_dir
+        self.games_recorded = 0
+        if replay is not None:
+            if replay.physics != physics_constants(self.profile):
+                raise ValueError("replay was recorded with different physics constants")
+            seed = replay.seed
+
+        # Every game owns its random streams: the seed fixes the first course,
+        # the courses after each restart and the clouds
+        self.seed = new_seed() if seed is None else check_seed(seed)
+        self.course_seeds = random.Random(self.seed)
+        self.clouds = ParallaxLayers(self.profile, random.Random(f"clouds:{self.seed}"))
+        self.scenery_frame = 0  # Steps the background has scrolled, across restarts
+
+        # All game rules live in the simulation; Game only renders it
+        self.sim = Simulation(self.seed, self.profile, swept=replay is None or replay.version >= 2)
+        self.action = NOOP
+        self.input = InputQueue()
+        self.remember_state()
+
+        # Opt-in dirty-rect presentation (see present())
+        self.dirty_rects = dirty_rects
+        self.presented_state = None
+        self.presented_rects = []
+
+        # Opt-in per-phase frame timings (F3 overlay, F4 dump); free when off
+        self.timer = NULL_TIMER
+        if timings:
+            self.enable_timings()
+
+    def enable_timings(self):
+        if not self.timer.enabled:
+            self.timer = self.sim.timer = FrameTimer()
+            self.timer.latencies["tap_to_photon"] = self.input.latency
+            self.timer.toggle_overlay()
+            self.presented_state = None
+
+    def remember_state(self):
+        # State before the latest physics step
+        self.prev_frame = self.sim.frame
+        self.pipes_moving = self.sim.game_started and not self.sim.game_over
+
     def reset_game(self):
-        self.bird = Bird()
-        self.pipes = []
-        self.pipe_timer = 0
-        self.score = 0
-        self.game_over = False
-        self.game_started = False
-        
-    def create_pipe(self):
-        return Pipe(SCREEN_WIDTH)
-    
-    def update_pipes(self):
-        pipe_speed = 3
-        
-        self.pipe_timer += 1
-        if self.pipe_timer > 90:  # Adjusted for 60 FPS (approx 1.5s) 
-            self.pipes.append(self.create_pipe())
-            self.pipe_timer = 0
-            
-        for pipe in self.pipes[:]:
-            pipe.update(pipe_speed)
-            
-            if pipe.x + PIPE_WIDTH < 0:
-                self.pipes.remove(pipe)
-                
-            if not pipe.passed and pipe.x + PIPE_WIDTH < self.bird.x:
-                pipe.passed = True
-                self.score += 1
-                
-            if pipe.collides_with(self.bird):
-                self.game_over = True
-
-    def draw_clouds(self):
-        for cloud in self.clouds:
-            cloud['x'] -= cloud['speed']
-            if cloud['x'] < -100:
-                cloud['x'] = SCREEN_WIDTH + 100
-                cloud['y'] = random.randint(20, 200)
-            
-            # Simple cloud drawing
-            pygame.draw.circle(self.screen, WHITE, (int(cloud['x']), int(cloud['y'])), 30)
-            pygame.draw.circle(self.screen, WHITE, (int(cloud['x'] - 20), int(cloud['y'] + 10)), 25)
-            pygame.draw.circle(self.screen, WHITE, (int(cloud['x'] + 20), int(cloud['y'] + 10)), 25)
-
-    def draw_background(self):
-        self.screen.fill(SKY_BLUE)
-        self.draw_clouds()
-        
-        # Ground
-        ground_rect = pygame.Rect(0, SCREEN_HEIGHT - GROUND_HEIGHT, SCREEN_WIDTH, GROUND_HEIGHT)
-        pygame.draw.rect(self.screen, GROUND_BROWN, ground_rect)
-        
-        # Ground decoration
-        pygame.draw.line(self.screen, (100, 200, 100), (0, SCREEN_HEIGHT - GROUND_HEIGHT), (SCREEN_WIDTH, SCREEN_HEIGHT - GROUND_HEIGHT), 10)
+        self.sim.reset(self.course_seeds.randrange(SEED_LIMIT))
+        self.input.clear()
+        self.remember_state()
+
+    def step(self):
+        # One fixed-size physics step; a queued flap applies to it only
+        self.remember_state()
+        if self.replay is not None:
+            self.action = FLAP if self.sim.frame in self.replay_flaps else NOOP
+        elif self.autopilot is not None:
+            self.action = self.autopilot(self.sim)
+        self.sim.step(self.action)
+        self.action = NOOP
+        if self.sim.frame != self.prev_frame:
+            self.scenery_frame += 1
+
+        # pipes_moving still holds the pre-step state, so this is the step the bird died
+        if self.record_dir and self.pipes_moving and self.sim.game_over:
+            self.save_replay()
+        self.timer.lap("step")
+
+    def save_replay(self):
+        os.makedirs(self.record_dir, exist_ok=True)
+        self.games_recorded += 1
+        name = f"{self.seed}-{self.games_recorded:03d}.fbr"
+        self.sim.to_replay().save(os.path.join(self.record_dir, name))
+
+    def draw_clouds(self, lead=0.0):
+        # lead is how many steps past the latest state to draw (see draw())
+        return self.clouds.draw(self.screen, self.scenery_frame + lead)
+
+    def draw_background(self, lead=0.0):
+        profile = self.profile
+        ground_y = profile.ground_y
+        self.screen.fill(SKY_BLUE, (0, 0, profile.screen_width, ground_y))
+        rects = self.draw_clouds(lead)
         
-        # Moving ground
-        offset = -(pygame.time.get_ticks() // 5) % 20
-        for i in range(offset, SCREEN_WIDTH, 20):
-             pygame.draw.line(self.screen, GROUND_LINE, (i, SCREEN_HEIGHT - GROUND_HEIGHT), (i - 10, SCREEN_HEIGHT), 2)
+        # Moving ground: scrolls with the pipes, driven by the simulation frame
+        scroll = self.sim.frame + lead
+        offset = -int(scroll * PIPE_SPEED) % GROUND_TILE
+        self.screen.blit(get_ground_strip(profile), (offset - GROUND_TILE, ground_y - GROUND_OVERHANG))
+        rects.append(pygame.Rect(0, ground_y - GROUND_OVERHANG, profile.screen_width, profile.ground_height + GROUND_OVERHANG))
+        return rects
 
     def draw_ui(self):
-        if self.game_started:
-             score_text = self.score_font.render(str(self.score), True, WHITE)
-             score_shadow = self.score_font.render(str(self.score), True, (0,0,0, 50))
-             self.screen.blit(score_shadow, (SCREEN_WIDTH//2 - 18, 52))
-             self.screen.blit(score_text, (SCREEN_WIDTH//2 - 20, 50))
+        # Returns the rects of the parts that change during play (the score)
+        sim = self.sim
+        center_x = self.profile.screen_width // 2
+        center_y = self.profile.screen_height // 2
+        rects = []
+        if sim.game_started:
+             rects.append(self.text.blit_number(self.screen, self.score_font, sim.score, (0,0,0, 50), (center_x - 18, 52)))
+             rects.append(self.text.blit_number(self.screen, self.score_font, sim.score, WHITE, (center_x - 20, 50)))
         
-        if not self.game_started and not self.game_over:
-            title_text = self.font.render("FLAPPY BIRD", True, BIRD_RED)
-            start_text = self.font.render("Press SPACE", True, WHITE)
+        if not sim.game_started and not sim.game_over:
+            title_text = self.text.render(self.font, "FLAPPY BIRD", BIRD_RED)
+            start_text = self.text.render(self.font, "Press SPACE", WHITE)
             
-            title_rect = title_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 50))
-            start_rect = start_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 20))
+            title_rect = title_text.get_rect(center=(center_x, center_y - 50))
+            start_rect = start_text.get_rect(center=(center_x, center_y + 20))
             
             self.screen.blit(title_text, title_rect)
             self.screen.blit(start_text, start_rect)
         
-        if self.game_over:
+        if sim.game_over:
             box_rect = pygame.Rect(50, 200, 300, 200)
             pygame.draw.rect(self.screen, GROUND_BROWN, box_rect, border_radius=10)
             pygame.draw.rect(self.screen, WHITE, box_rect, 3, border_radius=10)
             
-            game_over_text = self.font.render("GAME OVER", True, WHITE)
-            score_text = self.font.render(f"Score: {self.score}", True, BLACK)
-            restart_text = self.font.render("Press R to Restart", True, WHITE)
+            game_over_text = self.text.render(self.font, "GAME OVER", WHITE)
+            score_text = self.text.render(self.font, f"Score: {sim.score}", BLACK)
+            restart_text = self.text.render(self.font, "Press R to Restart", WHITE)
             
             self.screen.blit(game_over_text, (box_rect.centerx - game_over_text.get_width()//2, box_rect.y + 30))
             self.screen.blit(score_text, (box_rect.centerx - score_text.get_width()//2, box_rect.y + 80))
             self.screen.blit(restart_text, (box_rect.centerx - restart_text.get_width()//2, box_rect.y + 140))
+
+        return rects
+
+    def draw(self, lead=0.0):
+        # Renders a full frame lead steps past the latest physics state, moving
+        # everything along its current motion: the time elapsed since that
+        # step, or a negative lead right after a flap ran its step early (see
+        # run()). Returns the rects of everything that can move.
+        sim = self.sim
+        world_lead = 0.0 if sim.game_over else lead  # Clouds and ground scroll until game over
+        play_lead = world_lead if sim.game_started else 0.0  # Pipes and bird wait for the first flap
+        timer = self.timer
+        rects = self.draw_background(world_lead)
+        timer.lap("draw_background")
+        
+        pipe_shift = PIPE_SPEED * play_lead
+        for pipe in sim.pipes:
+            x = int(pipe.x - pipe_shift)
+            draw_pipe(self.screen, pipe, x)
+            rects.append(pygame.Rect(x - 4, 0, PIPE_WIDTH + 8, self.profile.screen_height))
+        timer.lap("draw_pipes")
+        
+        bird = sim.bird
+        y = min(max(bird.y + (bird.velocity + bird.gravity) * play_lead, 0), bird.floor_y)
+        rects.append(draw_bird(self.screen, bird, y))
+        timer.lap("bird.draw")
+        rects.extend(self.draw_ui())
+        timer.lap("draw_ui")
+        if timer.overlay:
+            rects.append(timer.draw(self.screen))
+            timer.lap("overlay")
+        return rects
+
+    def present(self, lead=0.0):
+        if not self.dirty_rects:
+            self.draw(lead)
+            pygame.display.flip()
+            self.timer.lap("flip")
+            return
+
+        # Nothing moves while the frame counter and game state stand still
+        # (e.g. the frozen game-over screen): skip drawing and presenting
+        moving = not self.sim.game_over
+        state = (self.sim.frame, self.sim.game_started, self.sim.game_over, lead if moving else None)
+        if state == self.presented_state:
+            return
+
+        rects = self.draw(lead)
+        if self.presented_state is None or state[1:3] != self.presented_state[1:3]:
+            # Title / playing / game-over switch: repaint everything once
+            pygame.display.flip()
+        else:
+            # Last frame's rects are where moving things were; this frame's where they are now
+            pygame.display.update(self.presented_rects + rects)
+        self.timer.lap("flip")
+        self.presented_state = state
+        self.presented_rects = rects
     
     def handle_events(self):
+        # Everything drained together is stamped with the time it was read
+        now = time.perf_counter()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 return False
-                
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE:
-                    if not self.game_started and not self.game_over:
-                        self.game_started = True
-                        self.bird.jump()
-                    elif not self.game_over:
-                        self.bird.jump()
-                        
-                elif event.key == pygame.K_r and self.game_over:
+
+            # Window contents were lost: the next dirty-rect frame must repaint everything
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self.presented_state = None
+
+            # Timing overlay and trace dump work in replays too
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                if self.timer.enabled:
+                    self.timer.toggle_overlay()
+                    self.presented_state = None
+                else:
+                    self.enable_timings()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4 and self.timer.enabled:
+                self.timer.dump()
+
+            # Replays ignore player input
+            if self.replay is not None:
+                continue
+
+            action = input_action(event)
+            if action is None:
+                continue
+            if self.sim.game_over:
+                if action != INPUT_FLAP:
                     self.reset_game()
-            
-            # Mouse click and touch support for mobile
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if not self.game_started and not self.game_over:
-                    self.game_started = True
-                    self.bird.jump()
-                elif not self.game_over:
-                    self.bird.jump()
-                elif self.game_over:
-                   self.reset_game()
-            
-            # Touch support for mobile devices (via pygame events)
-            if event.type == pygame.FINGERDOWN:
-                if not self.game_started and not self.game_over:
-                    self.game_started = True
-                    self.bird.jump()
-                elif not self.game_over:
-                    self.bird.jump()
-                elif self.game_over:
-                   self.reset_game()
+            elif action != INPUT_RESTART and self.autopilot is None:
+                self.input.push(now)
 
         return True
     
     async def run(self):
         running = True
+        step_time = 1.0 / (FPS * self.speed)
+        max_steps = MAX_STEPS_PER_FRAME * max(1, math.ceil(self.speed))
+        accumulator = 0.0
+        previous = time.perf_counter()
         
         while running:
+            self.timer.begin_frame()
             running = self.handle_events()
-            
-            if self.game_started and not self.game_over:
-                self.bird.update()
-                self.update_pipes()
-                
-                if (self.bird.y <= 0 or 
-                    self.bird.y >= SCREEN_HEIGHT - GROUND_HEIGHT - self.bird.size):
-                    self.game_over = True
-            
-            self.draw_background()
-            
-            for pipe in self.pipes:
-                pipe.draw(self.screen)
-            
-            self.bird.draw(self.screen)
-            
-            self.draw_ui()
-            
-            pygame.display.flip()
-            self.clock.tick(FPS)
+            self.timer.lap("handle_events")
+
+            # Fixed-timestep physics: the game runs at FPS steps per second no
+            # matter how fast or slow frames are rendered
+            now = time.perf_counter()
+            accumulator += now - previous
+            previous = now
+            steps = 0
+            window_end = now - accumulator + step_time  # Real time the next step's window closes
+            while accumulator >= step_time:
+                if steps == max_steps:
+                    accumulator = 0.0  # Can't keep up: slow down rather than spiral
+                    break
+                if self.input.take(window_end):
+                    self.action = FLAP
+                self.step()
+                accumulator -= step_time
+                window_end += step_time
+                steps += 1
+
+            # A flap read during the step in progress runs that step now, on
+            # borrowed time: the next step waits until the clock catches up
+            # and draw() extrapolates backwards meanwhile (lead in [-1, 0))
+            if accumulator >= 0 and self.input.take(float("inf")):
+                self.action = FLAP
+                self.step()
+                accumulator -= step_time
+
+            self.present(accumulator / step_time)
+            self.input.presented(time.perf_counter())
+            self.clock.tick(MAX_RENDER_FPS)
+            self.timer.lap("clock.tick")
+            self.timer.end_frame()
             await asyncio.sleep(0)  # Critical for web compatibility
         
         pygame.quit()
 
 if __name__ == "__main__":
-    game = Game()
+    parser = argparse.ArgumentParser(description="Flappy Bird")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        default=os.environ.get("FLAPPY_DIRTY_RECTS") == "1",
+                        help="only push changed screen regions to the display (FLAPPY_DIRTY_RECTS=1)")
+    parser.add_argument("--seed", type=seed_arg, help="play a reproducible sequence of courses")
+    parser.add_argument("--record", metavar="DIR", help="save a replay of every finished game to DIR")
+    parser.add_argument("--replay", metavar="FILE", help="watch a recorded replay instead of playing")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="game speed multiplier, for live play as well as --replay")
+    parser.add_argument("--profile", choices=available_profiles(),
+                        help="resolution/difficulty profile (default: $FLAPPY_PROFILE, else desktop)")
+    parser.add_argument("--timings", action="store_true",
+                        default=os.environ.get("FLAPPY_TIMINGS") == "1",
+                        help="time each frame phase; F3 toggles the overlay, F4 dumps a trace (FLAPPY_TIMINGS=1)")
+    args, _ = parser.parse_known_args()
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+
+    replay = Replay.load(args.replay) if args.replay else None
+    game = Game(seed=args.seed, dirty_rects=args.dirty_rects, replay=replay,
+                speed=args.speed, record_dir=args.record, profile=args.profile,
+                timings=args.timings)
     asyncio.run(game.run())
@@ -0,0 +1,221 @@
+"""Pixel observations of the game as NumPy arrays, for vision-based agents.
+
+    python game/pixels.py --frames 5000                 # 84x84 grayscale, 4-frame stacks
+    python game/pixels.py --full --rgb --workers 4      # full-resolution Game renderer
+
+Frames are read through a pygame.surfarray view straight into the
+caller's buffer (usually a FrameStack slot), so the only copy is the one
+into the observation. The low-resolution path draws the scene directly
+at the target size with scaled rects and pre-shrunk bird sprites; --full
+renders with the real Game drawing code instead.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+from main import (Game, Simulation, available_profiles, get_bird_sprite, load_profile, new_seed,
+                  FLAP, NOOP, PIPE_WIDTH, PIPE_CAP_HEIGHT, GROUND_OVERHANG,
+                  SKY_BLUE, PIPE_GREEN, PIPE_DARK_GREEN, GROUND_BROWN)
+
+GRAY_WEIGHTS = (77, 150, 29)  # ITU-R 601 luma in 1/256ths
+_small_birds = {}
+
+def read_pixels(surface, out, grayscale):
+    """Copy surface into out, (H, W) uint8 if grayscale else (H, W, 3)."""
+    view = pygame.surfarray.pixels3d(surface)  # (W, H, 3) view, no copy; locks the surface
+    try:
+        pixels = view.transpose(1, 0, 2)
+        if grayscale:
+            r, g, b = GRAY_WEIGHTS
+            luma = np.multiply(pixels[..., 0], r, dtype=np.uint16)
+            luma += np.multiply(pixels[..., 1], g, dtype=np.uint16)
+            luma += np.multiply(pixels[..., 2], b, dtype=np.uint16)
+            luma >>= 8
+            out[...] = luma
+        else:
+            out[...] = pixels
+    finally:
+        del view  # Unlocks the surface for the next frame's drawing
+    return out
+
+class LowResRenderer:
+    """Draws a Simulation directly at a small size (84x84 by default)."""
+
+    def __init__(self, profile, size=(84, 84)):
+        self.profile = profile
+        self.size = size
+        self.surface = pygame.Surface(size)
+        self.sx = size[0] / profile.screen_width
+        self.sy = size[1] / profile.screen_height
+
+    def bird_sprite(self, bird):
+        # Shrunk copies of the cached rotations, one per (full-size sprite, scale)
+        sprite, dx, dy = get_bird_sprite(bird.size, bird.rotation)
+        key = (id(sprite), self.size)
+        small = _small_birds.get(key)
+        if small is None:
+            w = max(1, round(sprite.get_width() * self.sx))
+            h = max(1, round(sprite.get_height() * self.sy))
+            small = _small_birds[key] = (pygame.transform.smoothscale(sprite, (w, h)), dx * self.sx, dy * self.sy)
+        return small
+
+    def draw(self, sim):
+        surface, sx, sy = self.surface, self.sx, self.sy
+        profile = self.profile
+        width, height = self.size
+        ground_y = int(profile.ground_y * sy)
+        surface.fill(SKY_BLUE)
+
+        cap_height = max(1, round(PIPE_CAP_HEIGHT * sy))
+        for pipe in sim.pipes:
+            left = int(pipe.x * sx)
+            right = int((pipe.x + PIPE_WIDTH) * sx)
+            cap_left = int((pipe.x - 4) * sx)
+            cap_right = int((pipe.x + PIPE_WIDTH + 4) * sx)
+            top = int(pipe.height * sy)
+            bottom = int((pipe.height + profile.pipe_gap) * sy)
+            surface.fill(PIPE_GREEN, (left, 0, right - left, top))
+            surface.fill(PIPE_GREEN, (left, bottom, right - left, ground_y - bottom))
+            surface.fill(PIPE_DARK_GREEN, (cap_left, top - cap_height, cap_right - cap_left, cap_height))
+            surface.fill(PIPE_DARK_GREEN, (cap_left, bottom, cap_right - cap_left, cap_height))
+
+        surface.fill((100, 200, 100), (0, ground_y - max(1, round(GROUND_OVERHANG * sy)), width, height))
+        surface.fill(GROUND_BROWN, (0, ground_y, width, height - ground_y))
+
+        bird = sim.bird
+        sprite, dx, dy = self.bird_sprite(bird)
+        centre_x = (bird.x + bird.size // 2) * sx
+        centre_y = (bird.y + bird.size // 2) * sy
+        surface.blit(sprite, (int(centre_x + dx), int(centre_y + dy)))
+        return surface
+
+class FrameStack:
+    """The last k frames in a preallocated ring, oldest first on read."""
+
+    def __init__(self, k, shape):
+        self.frames = np.zeros((k,) + shape, dtype=np.uint8)
+        self.index = 0
+
+    def slot(self):
+        # Buffer the next frame should be written into
+        return self.frames[self.index]
+
+    def push(self):
+        self.index = (self.index + 1) % len(self.frames)
+
+    def fill(self):
+        # Start of an episode: every slot holds the first frame
+        self.frames[:] = self.frames[self.index - 1]
+
+    def stacked(self):
+        return np.concatenate([self.frames[self.index:], self.frames[:self.index]])
+
+class PixelEnv:
+    """Simulation with pixel observations: reset() / step(action) -> stacked frames.
+
+    The reward of a step is the number of pipes it passed.
+    """
+
+    def __init__(self, seed=None, profile=None, size=(84, 84), grayscale=True, stack=4, full=False):
+        self.profile = load_profile(profile)
+        self.grayscale = grayscale
+        if full:
+            self.game = Game(seed=seed, profile=self.profile, offscreen=True)
+            self.sim = self.game.sim
+            size = (self.profile.screen_width, self.profile.screen_height)
+        else:
+            self.game = None
+            self.sim = Simulation(seed, self.profile)
+            self.renderer = LowResRenderer(self.profile, size)
+        shape = (size[1], size[0]) if grayscale else (size[1], size[0], 3)
+        self.stack = FrameStack(stack, shape)
+
+    def render(self):
+        if self.game is not None:
+            self.game.draw()
+            surface = self.game.screen
+        else:
+            surface = self.renderer.draw(self.sim)
+        read_pixels(surface, self.stack.slot(), self.grayscale)
+        self.stack.push()
+
+    def reset(self, seed=None):
+        if self.game is not None:
+            self.game.sim.reset(new_seed() if seed is None else seed)
+            self.game.remember_state()
+        else:
+            self.sim.reset(new_seed() if seed is None else seed)
+        self.render()
+        self.stack.fill()
+        return self.stack.stacked()
+
+    def step(self, action):
+        score = self.sim.score
+        if self.game is not None:
+            self.game.action = action
+            self.game.step()
+        else:
+            self.sim.step(action)
+        self.render()
+        return self.stack.stacked(), self.sim.score - score, self.sim.game_over
+
+def run_worker(frames, seed, size, grayscale, stack, full, profile):
+    # Random flapping with restarts; returns (frames rendered, seconds)
+    env = PixelEnv(seed, profile, size, grayscale, stack, full)
+    rng = np.random.default_rng(seed)
+    actions = np.where(rng.random(frames) < 0.07, FLAP, NOOP)
+    env.reset(seed)
+    start = time.perf_counter()
+    for i in range(frames):
+        _, _, done = env.step(actions[i])
+        if done:
+            env.reset()
+    return frames, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=5000, help="frames per worker")
+    parser.add_argument("--size", type=int, nargs=2, default=(84, 84), metavar=("W", "H"))
+    parser.add_argument("--rgb", action="store_true", help="RGB instead of grayscale")
+    parser.add_argument("--stack", type=int, default=4)
+    parser.add_argument("--full", action="store_true", help="render with Game at full resolution")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--profile", choices=available_profiles())
+    parser.add_argument("--save", metavar="PNG", help="also save one observation frame")
+    args = parser.parse_args()
+
+    job = (args.frames, tuple(args.size), not args.rgb, args.stack, args.full, args.profile)
+    if args.workers == 1:
+        results = [run_worker(job[0], 0, *job[1:])]
+    else:
+        with ProcessPoolExecutor(args.workers) as pool:
+            results = list(pool.map(run_worker, *zip(*[(job[0], seed) + job[1:] for seed in range(args.workers)])))
+
+    env = PixelEnv(0, args.profile, tuple(args.size), not args.rgb, args.stack, args.full)
+    obs = env.reset(0)
+    kind = "RGB" if args.rgb else "grayscale"
+    print(f"observation: {obs.shape} uint8 ({kind}, {args.stack} stacked, "
+          f"{'full Game render' if args.full else 'low-res render'})")
+    per_core = sum(frames / seconds for frames, seconds in results) / len(results)
+    print(f"{per_core:,.0f} frames/sec/core over {len(results)} worker(s), "
+          f"{per_core * len(results):,.0f} frames/sec total")
+
+    if args.save:
+        env.step(FLAP)
+        for _ in range(200):
+            obs, _, _ = env.step(FLAP if env.sim.bird.y > env.profile.screen_height // 2 else NOOP)
+        frame = obs[-1]
+        if frame.ndim == 2:
+            frame = np.stack([frame] * 3, axis=-1)
+        pygame.image.save(pygame.surfarray.make_surface(frame.transpose(1, 0, 2)), args.save)
+        print(f"saved {args.save}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import argparse
+import struct
+import time
+
+# Replay file layout (little endian):
+#   header   magic, version, physics constants, seed, final frame/score,
+#            flap count, first flap frame, Rice parameters
+#   payload  gaps between consecutive flaps, Rice-coded around their median
+#
+# Flaps during play come every ~20-40 frames, so each one costs ~5 bits and
+# a 10-minute run fits in well under a kilobyte.
+MAGIC = b"FBRP"
+VERSION = 2  # 2 added swept pipe collisions; version 1 files still load and replay with the old test
+PHYSICS_FORMAT = "<2d9H"  # gravity, jump_strength, bird x/size, screen, ground, pipe w/gap/speed/interval
+HEADER_FORMAT = "<4sB" + PHYSICS_FORMAT[1:] + "QIIIIBH"
+
+class Replay:
+    def __init__(self, seed, flaps, frames, score, physics, version=VERSION):
+        self.seed = seed
+        self.flaps = list(flaps)  # Frame indices (Simulation.frame) where the player flapped
+        self.frames = frames
+        self.score = score
+        self.physics = tuple(physics)
+        self.version = version
+
+    def __eq__(self, other):
+        return isinstance(other, Replay) and self.__dict__ == other.__dict__
+
+    def to_bytes(self):
+        gaps = [b - a for a, b in zip(self.flaps, self.flaps[1:])]
+        base = sorted(gaps)[len(gaps) // 2] if gaps else 0
+        values = [zigzag(gap - base) for gap in gaps]
+        k = min(range(16), key=lambda k: rice_length(values, k))
+
+        bits = BitWriter()
+        for value in values:
+            bits.write_rice(value, k)
+
+        first = self.flaps[0] if self.flaps else 0
+        header = struct.pack(HEADER_FORMAT, MAGIC, self.version, *self.physics, self.seed,
+                             self.frames, self.score, len(self.flaps), first, k, base)
+        return header + bits.to_bytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        size = struct.calcsize(HEADER_FORMAT)
+        if len(data) < size:
+            raise ValueError("replay is truncated")
+        fields = struct.unpack(HEADER_FORMAT, data[:size])
+        magic, version = fields[:2]
+        if magic != MAGIC:
+            raise ValueError("not a replay file")
+        if not 1 <= version <= VERSION:
+            raise ValueError(f"unsupported replay version {version}")
+
+        physics = fields[2:13]
+        seed, frames, score, count, first, k, base = fields[13:]
+        flaps = []
+        if count:
+            bits = BitReader(data[size:])
+            flaps.append(first)
+            for _ in range(count - 1):
+                flaps.append(flaps[-1] + base + unzigzag(bits.read_rice(k)))
+        return cls(seed, flaps, frames, score, physics, version)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+def zigzag(n):
+    return 2 * n if n >= 0 else -2 * n - 1
+
+def unzigzag(n):
+    return n // 2 if n % 2 == 0 else -(n + 1) // 2
+
+def rice_length(values, k):
+    return sum((v >> k) + 1 + k for v in values)
+
+class BitWriter:
+    def __init__(self):
+        self.value = 0
+        self.length = 0
+
+    def write(self, value, nbits):
+        self.value = (self.value << nbits) | value
+        self.length += nbits
+
+    def write_rice(self, value, k):
+        quotient = value >> k
+        self.write((1 << (quotient + 1)) - 2, quotient + 1)  # quotient ones, then a zero
+        self.write(value & ((1 << k) - 1), k)
+
+    def to_bytes(self):
+        pad = -self.length % 8
+        return (self.value << pad).to_bytes((self.length + pad) // 8, "big")
+
+class BitReader:
+    def __init__(self, data):
+        self.value = int.from_bytes(data, "big")
+        self.length = len(data) * 8
+        self.pos = 0
+
+    def read(self, nbits):
+        if self.pos + nbits > self.length:
+            raise ValueError("replay payload is truncated")
+        self.pos += nbits
+        return (self.value >> (self.length - self.pos)) & ((1 << nbits) - 1)
+
+    def read_rice(self, k):
+        quotient = 0
+        while self.read(1):
+            quotient += 1
+        return (quotient << k) | self.read(k)
+
+if __name__ == "__main__":
+    from core import run_replay
+
+    parser = argparse.ArgumentParser(description="Play replays back headlessly at full speed")
+    parser.add_argument("replays", nargs="+")
+    args = parser.parse_args()
+
+    for path in args.replays:
+        replay = Replay.load(path)
+        start = time.perf_counter()
+        sim = run_replay(replay)
+        elapsed = time.perf_counter() - start
+        status = "OK" if (sim.frame, sim.score) == (replay.frames, replay.score) else "MISMATCH"
+        print(f"{path}: {status} score {sim.score} (recorded {replay.score}), "
+              f"{sim.frame} frames in {elapsed * 1000:.1f} ms, {len(replay.to_bytes())} bytes")
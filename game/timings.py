@@ -0,0 +1,184 @@
+import json
+import os
+import sys
+import time
+from collections import deque
+
+OVERLAY_REFRESH = 0.5  # Seconds between overlay redraws; percentiles over the whole ring
+OVERLAY_PERCENTILES = (0.5, 0.99)
+SUMMARY_PERCENTILES = (0.5, 0.9, 0.99)
+WHITE = (255, 255, 255)
+
+def percentile(samples, p):
+    # Nearest rank on an already sorted list
+    return samples[min(len(samples) - 1, int(len(samples) * p))] if samples else 0.0
+
+def stats_row(samples, percentiles):
+    # Percentiles, mean and max of millisecond samples, as one summary() row
+    samples = sorted(samples)
+    stats = {f"p{round(p * 100)}": percentile(samples, p) for p in percentiles}
+    stats["mean"] = sum(samples) / len(samples) if samples else 0.0
+    stats["max"] = samples[-1] if samples else 0.0
+    return {name: round(value, 4) for name, value in stats.items()}
+
+class NullTimer:
+    # Stand-in when timings are off: every hook is a no-op
+    enabled = False
+    overlay = False
+
+    def begin_frame(self):
+        pass
+
+    def lap(self, phase):
+        pass
+
+    def end_frame(self):
+        pass
+
+NULL_TIMER = NullTimer()
+
+class LatencyLog:
+    """The last capacity latency samples (seconds), e.g. tap to photon."""
+
+    def __init__(self, capacity=256):
+        self.samples = deque(maxlen=capacity)
+
+    def record(self, seconds):
+        self.samples.append(seconds)
+
+    def stats(self, percentiles=SUMMARY_PERCENTILES):
+        return stats_row([sample * 1000 for sample in self.samples], percentiles)
+
+class FrameTimer:
+    """Per-phase frame timings kept in a fixed-size ring of recent frames.
+
+    Phases are timed with lap(name), which charges the time since the
+    previous lap to name, so the hooks sit between phases rather than
+    around them. A phase lapped several times in one frame (e.g. several
+    physics steps) accumulates.
+    """
+
+    enabled = True
+
+    def __init__(self, capacity=1200):
+        self.capacity = capacity
+        self.frames = [None] * capacity  # Ring of {phase: seconds}
+        self.count = 0
+        self.phases = []  # In first-seen order; "total" is kept per frame too
+        self.current = None
+        self.mark = None
+        self.overlay = False
+        self.overlay_surface = None
+        self.overlay_time = 0.0
+        self.font = None
+        self.latencies = {}  # Extra summary rows: name -> LatencyLog
+
+    def begin_frame(self):
+        # Time spent outside the loop body (the asyncio yield) opens the frame
+        self.current = {}
+        self.lap("yield")
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        if self.mark is not None and self.current is not None:
+            self.current[phase] = self.current.get(phase, 0.0) + now - self.mark
+            if phase not in self.phases:
+                self.phases.append(phase)
+        self.mark = now
+
+    def end_frame(self):
+        if self.current is None:
+            return
+        self.current["total"] = sum(self.current.values())
+        self.frames[self.count % self.capacity] = self.current
+        self.count += 1
+        self.current = None
+
+    def recent(self):
+        # Frames in the ring, oldest first
+        if self.count <= self.capacity:
+            return self.frames[:self.count]
+        start = self.count % self.capacity
+        return self.frames[start:] + self.frames[:start]
+
+    def columns(self):
+        return self.phases + ["total"]
+
+    def summary(self, percentiles=SUMMARY_PERCENTILES):
+        """Milliseconds per phase over the ring: percentiles, mean and max.
+
+        Each log in latencies with samples adds a row under its name.
+        """
+        frames = self.recent()
+        result = {}
+        for phase in self.columns():
+            result[phase] = stats_row([frame.get(phase, 0.0) * 1000 for frame in frames], percentiles)
+        for name, log in self.latencies.items():
+            if log.samples:
+                result[name] = log.stats(percentiles)
+        return result
+
+    def trace_csv(self):
+        # One row per frame in the ring, milliseconds per phase
+        columns = self.columns()
+        frames = self.recent()
+        lines = ["frame," + ",".join(columns)]
+        for index, frame in enumerate(frames, self.count - len(frames)):
+            lines.append(f"{index}," + ",".join(f"{frame.get(phase, 0.0) * 1000:.4f}" for phase in columns))
+        return "\n".join(lines) + "\n"
+
+    def trace_json(self):
+        return json.dumps({"frames": len(self.recent()), "unit": "ms", "phases": self.summary()}, indent=1)
+
+    def dump(self, directory="."):
+        # In the browser there is no file to open, so the trace goes to the console
+        if sys.platform == "emscripten":
+            print("--- frame timings (csv) ---")
+            print(self.trace_csv(), end="")
+            print("--- frame timings (json) ---")
+            print(self.trace_json())
+            return None
+        base = os.path.join(directory, f"timings-{int(time.time())}")
+        with open(base + ".csv", "w") as f:
+            f.write(self.trace_csv())
+        with open(base + ".json", "w") as f:
+            f.write(self.trace_json())
+        print(f"frame timings written to {base}.csv and {base}.json")
+        return base
+
+    def toggle_overlay(self):
+        self.overlay = not self.overlay
+        self.overlay_surface = None
+
+    def draw(self, screen):
+        # The text is re-rendered every OVERLAY_REFRESH seconds, not per frame
+        now = time.perf_counter()
+        if self.overlay_surface is None or now - self.overlay_time > OVERLAY_REFRESH:
+            self.overlay_surface = self.render_overlay()
+            self.overlay_time = now
+        return screen.blit(self.overlay_surface, (4, 4))
+
+    def render_overlay(self):
+        # Imported here so headless simulations can hold a timer without loading SDL
+        import pygame
+        if self.font is None:
+            self.font = pygame.font.Font(None, 18)
+        names = [f"p{round(p * 100)}" for p in OVERLAY_PERCENTILES] + ["max"]
+        rows = [["ms"] + names]
+        for phase, stats in self.summary(OVERLAY_PERCENTILES).items():
+            rows.append([phase] + [f"{stats[name]:.2f}" for name in names])
+
+        # The default font is proportional: lay the table out in columns
+        cells = [[self.font.render(text, True, WHITE) for text in row] for row in rows]
+        widths = [max(row[i].get_width() for row in cells) + 8 for i in range(len(rows[0]))]
+        line_height = self.font.get_linesize()
+        surface = pygame.Surface((sum(widths) + 4, line_height * len(cells) + 8), pygame.SRCALPHA)
+        surface.fill((0, 0, 0, 160))
+        for row_index, row in enumerate(cells):
+            x = 4
+            for column, (cell, width) in enumerate(zip(row, widths)):
+                # Names left-aligned, numbers right-aligned
+                offset = 0 if column == 0 else width - 8 - cell.get_width()
+                surface.blit(cell, (x + offset, 4 + row_index * line_height))
+                x += width
+        return surface
@@ -1,7 +1,25 @@
 import os
-from flask import Flask, render_template, send_from_directory
+import sys
+from flask import Flask, jsonify, render_template, request, url_for
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from assets import GameAssets
+from leaderboard import Leaderboard
+from replays import MAX_REPLAY_BYTES, DuplicateReplay, ReplayVerifier
 
 app = Flask(__name__, static_folder='static', static_url_path='/static')
+app.config['MAX_CONTENT_LENGTH'] = MAX_REPLAY_BYTES
+
+# Fingerprinted, precompressed pygbag build written by build_assets.py
+game_assets = GameAssets(os.path.join(app.static_folder, 'game-dist'),
+                         os.path.join(app.static_folder, 'game'))
+
+# Verified scores only: a score reaches the board once its replay reproduces it
+leaderboard = Leaderboard(os.environ.get('LEADERBOARD_DB',
+                                         os.path.join(os.path.dirname(os.path.abspath(__file__)), 'leaderboard.db')))
+verifier = ReplayVerifier(workers=int(os.environ.get('REPLAY_WORKERS', 0)) or None,
+                          max_pending=int(os.environ.get('REPLAY_QUEUE', 64)),
+                          on_accepted=leaderboard.add, is_known=leaderboard.has_replay)
 
 @app.route('/')
 def index():
@@ -14,12 +32,55 @@ def play():
 @app.route('/game/')
 def game():
     """Serve the Pygame web build"""
-    return send_from_directory(os.path.join(app.static_folder, 'game'), 'index.html')
+    return game_assets.send('index.html')
 
 @app.route('/game/<path:filename>')
 def serve_game_files(filename):
     """Serve game assets (JS, CSS, WASM, etc)"""
-    return send_from_directory(os.path.join(app.static_folder, 'game'), filename)
+    return game_assets.send(filename)
+
+@app.route('/api/replays', methods=['POST'])
+def submit_replay():
+    """Queue a replay for verification; poll the returned URL for the verdict"""
+    player = (request.args.get('player') or 'anonymous')[:32]
+    try:
+        job_id = verifier.submit(request.get_data(), player)
+    except DuplicateReplay as e:
+        # Each run counts once, whoever posts it
+        return jsonify(error=str(e)), 409
+    if job_id is None:
+        # Backpressure: the verification queue is full (or its pool keeps breaking),
+        # so shed load instead of queueing forever
+        response = jsonify(error='verification queue is full, retry shortly')
+        response.headers['Retry-After'] = '2'
+        return response, 503
+    location = url_for('replay_status', job_id=job_id)
+    return jsonify(id=job_id, status='pending', url=location), 202, {'Location': location}
+
+@app.route('/api/replays/<job_id>')
+def replay_status(job_id):
+    """Verification verdict for a submitted replay"""
+    job = verifier.status(job_id)
+    if job is None:
+        return jsonify(error='unknown replay'), 404
+    return jsonify(id=job_id, **job)
+
+@app.route('/api/leaderboard')
+def get_leaderboard():
+    """Top verified scores"""
+    limit = request.args.get('limit', 10, type=int)
+    if limit < 1:
+        return jsonify(error='limit must be a positive integer'), 400
+    limit = min(limit, leaderboard.top_n)
+    return jsonify([{'player': player, 'score': score} for player, score in leaderboard.top_scores(limit)])
+
+@app.route('/api/leaderboard/<player>')
+def get_player_best(player):
+    """A player's best verified score"""
+    best = leaderboard.player_best(player)
+    if best is None:
+        return jsonify(error='no verified scores for this player'), 404
+    return jsonify(player=player, score=best)
 
 @app.after_request
 def add_header(response):
@@ -0,0 +1,62 @@
+import json
+import mimetypes
+import os
+
+from flask import request, send_file, send_from_directory
+
+mimetypes.add_type('application/wasm', '.wasm')
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'  # Cache, but check the ETag before every reuse
+
+class GameAssets:
+    """Serves the pygbag build from the output of build_assets.py.
+
+    Picks the smallest precompressed variant the client accepts, sends
+    strong ETags, lets send_file answer conditional and Range requests,
+    and marks fingerprinted names immutable. Without a build (local
+    development) it falls back to the raw pygbag directory.
+    """
+
+    def __init__(self, dist_dir, fallback_dir):
+        self.dist_dir = dist_dir
+        self.fallback_dir = fallback_dir
+        self.manifest = None
+        self.manifest_mtime = None
+
+    def load_manifest(self):
+        path = os.path.join(self.dist_dir, 'manifest.json')
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            self.manifest = None
+            return None
+        if mtime != self.manifest_mtime:
+            with open(path) as f:
+                self.manifest = json.load(f)
+            self.manifest_mtime = mtime
+        return self.manifest
+
+    def send(self, filename):
+        manifest = self.load_manifest()
+        if manifest is None:
+            return send_from_directory(self.fallback_dir, filename)
+        entry = manifest.get(filename)
+        if entry is None:
+            return send_from_directory(self.fallback_dir, filename)
+
+        encoding = None
+        for candidate in ('br', 'gzip'):
+            if candidate in entry['encodings'] and request.accept_encodings[candidate]:
+                encoding = candidate
+                break
+        path = entry['encodings'][encoding] if encoding else entry['file']
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+        response = send_file(os.path.join(self.dist_dir, path), mimetype=mimetype, conditional=True,
+                             etag=f"{entry['etag']}-{encoding or 'identity'}")
+        if encoding and response.status_code != 304:
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.headers['Cache-Control'] = IMMUTABLE if entry['immutable'] else REVALIDATE
+        return response
@@ -0,0 +1,108 @@
+"""Build step for the pygbag output: fingerprint and precompress.
+
+    python website/build_assets.py [--src website/static/game] [--dest website/static/game-dist]
+
+Every asset is copied to a content-hashed name (game.<hash>.apk) with
+gzip and, if the brotli module is installed, brotli variants next to it.
+index.html is rewritten to reference the hashed names and is compressed
+but keeps its own name. manifest.json records what the server may send
+for each requested name (see assets.py).
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ENTRY_POINT = 'index.html'
+MIN_SAVING = 0.9  # Keep a compressed variant only if it is at most 90% of the original
+
+def fingerprint(name, digest):
+    base, ext = os.path.splitext(name)
+    return f'{base}.{digest}{ext}'
+
+def compress(path, data):
+    encodings = {}
+    variants = [('gzip', '.gz', lambda d: gzip.compress(d, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.insert(0, ('br', '.br', lambda d: brotli.compress(d, quality=11)))
+    for encoding, suffix, encode in variants:
+        packed = encode(data)
+        if len(packed) <= len(data) * MIN_SAVING:
+            with open(path + suffix, 'wb') as f:
+                f.write(packed)
+            encodings[encoding] = os.path.basename(path) + suffix
+    return encodings
+
+def rewrite_references(html, renames):
+    # Swap every quoted/attribute reference to an asset for its hashed name
+    for name in sorted(renames, key=len, reverse=True):
+        html = re.sub(r'(?<![\w./-])(\./)?' + re.escape(name) + r'(?![\w.-])',
+                      lambda m: (m.group(1) or '') + renames[name], html)
+    return html
+
+def build(src, dest):
+    if os.path.isdir(dest):
+        shutil.rmtree(dest)
+    os.makedirs(dest)
+
+    assets = {}
+    for root, _, files in os.walk(src):
+        for filename in files:
+            path = os.path.join(root, filename)
+            name = os.path.relpath(path, src).replace(os.sep, '/')
+            if name != ENTRY_POINT:
+                with open(path, 'rb') as f:
+                    assets[name] = f.read()
+
+    manifest = {}
+    renames = {}
+    for name, data in sorted(assets.items()):
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        hashed = fingerprint(name, digest)
+        target = os.path.join(dest, hashed)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'wb') as f:
+            f.write(data)
+        entry = {'file': hashed, 'etag': digest, 'encodings': {}}
+        directory = os.path.dirname(hashed)
+        for encoding, variant in compress(target, data).items():
+            entry['encodings'][encoding] = f'{directory}/{variant}' if directory else variant
+        # Hashed names never change content; original names may be rebuilt
+        manifest[hashed] = dict(entry, immutable=True)
+        manifest[name] = dict(entry, immutable=False)
+        renames[name] = hashed
+
+    with open(os.path.join(src, ENTRY_POINT), encoding='utf-8') as f:
+        html = rewrite_references(f.read(), renames).encode('utf-8')
+    target = os.path.join(dest, ENTRY_POINT)
+    with open(target, 'wb') as f:
+        f.write(html)
+    manifest[ENTRY_POINT] = {'file': ENTRY_POINT, 'etag': hashlib.sha256(html).hexdigest()[:12],
+                             'encodings': compress(target, html), 'immutable': False}
+
+    with open(os.path.join(dest, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    return manifest
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fingerprint and precompress the pygbag build')
+    parser.add_argument('--src', default=os.path.join(HERE, 'static', 'game'))
+    parser.add_argument('--dest', default=os.path.join(HERE, 'static', 'game-dist'))
+    args = parser.parse_args()
+
+    if brotli is None:
+        print('brotli not installed: writing gzip variants only')
+    manifest = build(args.src, args.dest)
+    for name, entry in sorted(manifest.items()):
+        if not entry['immutable']:
+            variants = ', '.join(entry['encodings']) or 'uncompressed'
+            print(f"{name} -> {entry['file']} ({variants})")
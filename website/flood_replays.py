@@ -0,0 +1,124 @@
+"""Synthetic replay flood against a running server.
+
+    python website/app.py &
+    python website/flood_replays.py --count 2000 --concurrency 64
+
+Posts a mix of honest and forged replays as fast as possible while timing
+page loads of / in parallel, then waits for every verdict. Honest replays
+should be accepted, forged ones rejected, overflow answered with 503, and
+page latency should stay flat throughout. The server takes each run only
+once, so every payload is a different run.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'game'))
+
+from core import Simulation, gap_chaser
+from replay import Replay
+
+def honest_replays(count, max_frames, per_seed=64):
+    # gap_chaser plays long, honest games. Each of its last per_seed frames
+    # (or its death) ends a different run, all about max_frames long.
+    replays = []
+    seed = 0
+    while len(replays) < count:
+        sim = Simulation(seed)
+        while sim.frame < max_frames and sim.step(gap_chaser(sim)):
+            if sim.frame > max_frames - per_seed:
+                replays.append(sim.to_replay())
+        if sim.game_over:
+            replays.append(sim.to_replay())
+        seed += 1
+    return replays[:count]
+
+def post(url, data, retry):
+    # With retry, honour 503 Retry-After until the replay is queued
+    while True:
+        request = urllib.request.Request(url, data=data, method='POST',
+                                         headers={'Content-Type': 'application/octet-stream'})
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return response.status, json.load(response)
+        except urllib.error.HTTPError as e:
+            if e.code != 503 or not retry:
+                return e.code, None
+            time.sleep(float(e.headers.get('Retry-After', 1)))
+
+def get_json(url):
+    with urllib.request.urlopen(url, timeout=30) as response:
+        return json.load(response)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--count', type=int, default=1000, help='replays to submit')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--forged', type=float, default=0.25, help='fraction of forged replays')
+    parser.add_argument('--frames', type=int, default=3600, help='length of each honest replay')
+    parser.add_argument('--retry', action='store_true', help='resubmit replays shed with 503')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print('recording bot replays...')
+    payloads = []
+    for replay in honest_replays(args.count, args.frames):
+        forged = rng.random() < args.forged
+        if forged:
+            replay = Replay(replay.seed, replay.flaps, replay.frames, replay.score + 5, replay.physics, replay.version)
+        payloads.append((forged, replay.to_bytes()))
+
+    # Page latency probe running alongside the flood
+    latencies = []
+    stop = threading.Event()
+    def probe():
+        while not stop.is_set():
+            start = time.perf_counter()
+            urllib.request.urlopen(args.url + '/', timeout=30).read()
+            latencies.append(time.perf_counter() - start)
+            time.sleep(0.05)
+    prober = threading.Thread(target=probe, daemon=True)
+    prober.start()
+
+    submit_url = args.url + '/api/replays?player=flood'
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        results = list(pool.map(lambda p: (p[0],) + post(submit_url, p[1], args.retry), payloads))
+    submitted = time.perf_counter() - start
+
+    jobs = [(forged, body['url']) for forged, status, body in results if status == 202]
+    shed = sum(1 for _, status, _ in results if status == 503)
+    repeats = sum(1 for _, status, _ in results if status == 409)  # Runs already on this server's board
+    verdicts = {'accepted': [0, 0], 'rejected': [0, 0], 'error': [0, 0]}
+    for forged, url in jobs:
+        while True:
+            job = get_json(args.url + url)
+            if job['status'] != 'pending':
+                verdicts[job['status']][forged] += 1
+                break
+            time.sleep(0.05)
+    verified = time.perf_counter() - start
+    stop.set()
+    prober.join()
+
+    latencies.sort()
+    print(f'{args.count} submissions in {submitted:.2f}s: {len(jobs)} queued, {shed} shed with 503, '
+          f'{repeats} repeats refused with 409')
+    print(f'all verdicts in {verified:.2f}s ({len(jobs) / verified:.0f} replays/s)')
+    for status, (honest_count, forged_count) in verdicts.items():
+        print(f'  {status:<9} honest {honest_count:>6}  forged {forged_count:>6}')
+    if latencies:
+        print(f'GET / during flood: p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, '
+              f'max {latencies[-1] * 1000:.1f} ms over {len(latencies)} requests')
+    print('leaderboard:', get_json(args.url + '/api/leaderboard')[:3])
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+import bisect
+import logging
+import queue
+import sqlite3
+import threading
+import time
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    created REAL NOT NULL,
+    replay TEXT
+);
+CREATE INDEX IF NOT EXISTS scores_by_score ON scores (score DESC, id);
+'''
+# Key of the run that earned each score (replays.replay_key), unique so a run
+# counts once; NULL for rows added without one. Created after migrating
+# databases from before the column existed.
+REPLAY_INDEX = 'CREATE UNIQUE INDEX IF NOT EXISTS scores_by_replay ON scores (replay)'
+WRITE_ATTEMPTS = 3  # Tries per batch before it is dropped, backing off between them
+
+log = logging.getLogger(__name__)
+
+class Leaderboard:
+    """Scores persisted in SQLite, served from memory.
+
+    add() only enqueues; a single writer thread group-commits queued scores
+    in one transaction per batch. Reads come from an in-memory top-N list
+    and per-player best table, updated incrementally from rows newer than
+    the last one seen. That also picks up rows written by other processes
+    sharing the file (e.g. other gunicorn workers).
+
+    The queue holds at most max_queue scores; add() waits up to
+    enqueue_timeout for room and then drops the score. A batch that still
+    fails after WRITE_ATTEMPTS tries (locked database, full disk) is
+    logged and dropped, and the writer carries on with the next one.
+    """
+
+    def __init__(self, path, top_n=100, batch_size=512, flush_interval=0.05, refresh_interval=1.0,
+                 max_queue=8192, enqueue_timeout=1.0, retry_delay=0.5):
+        self.path = path
+        self.top_n = top_n
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.refresh_interval = refresh_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.retry_delay = retry_delay
+
+        self.lock = threading.Lock()
+        self.top = []   # (-score, id, player), best first
+        self.best = {}  # player -> best score
+        self.last_id = 0
+        self.last_refresh = 0.0
+        self.batches = 0
+        self.written = 0
+        self.dropped = 0
+
+        self.reader = self.connect()
+        self.reader.executescript(SCHEMA)
+        columns = [row[1] for row in self.reader.execute('PRAGMA table_info(scores)')]
+        if 'replay' not in columns:
+            self.reader.execute('ALTER TABLE scores ADD COLUMN replay TEXT')
+        self.reader.execute(REPLAY_INDEX)
+        self.load()
+
+        self.queue = queue.Queue(max_queue)
+        self.writer = threading.Thread(target=self.write_loop, name='leaderboard-writer', daemon=True)
+        self.writer.start()
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')  # Durable at checkpoints; WAL keeps it consistent
+        return conn
+
+    def load(self):
+        # One-off full read at startup; everything after is incremental
+        with self.lock:
+            rows = self.reader.execute(
+                'SELECT score, id, player FROM scores ORDER BY score DESC, id LIMIT ?', (self.top_n,))
+            self.top = [(-score, row_id, player) for score, row_id, player in rows]
+            self.best = dict(self.reader.execute('SELECT player, MAX(score) FROM scores GROUP BY player'))
+            self.last_id = self.reader.execute('SELECT COALESCE(MAX(id), 0) FROM scores').fetchone()[0]
+            self.last_refresh = time.monotonic()
+
+    def add(self, player, score, replay=None):
+        # Returns False if the score was dropped because the writer is backed
+        # up. A score for a replay key that is already on the board is ignored.
+        try:
+            self.queue.put((player, score, time.time(), replay), timeout=self.enqueue_timeout)
+        except queue.Full:
+            log.error('leaderboard queue is full, dropping score %d for %r', score, player)
+            self.dropped += 1
+            return False
+        return True
+
+    def write_loop(self):
+        conn = self.connect()
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            batch = [item]
+            # Group commit: gather whatever else arrives within flush_interval
+            deadline = time.monotonic() + self.flush_interval
+            stop = False
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            conn = self.write_batch(conn, batch)
+            if stop:
+                break
+        conn.close()
+
+    def write_batch(self, conn, batch):
+        # One transaction per batch. An SQLite error must not kill the only
+        # writer thread: roll back, back off and retry, and in the end drop
+        # the batch. Returns the connection to keep using.
+        for attempt in range(WRITE_ATTEMPTS):
+            changes = conn.total_changes
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                conn.executemany('INSERT OR IGNORE INTO scores (player, score, created, replay) VALUES (?, ?, ?, ?)',
+                                 batch)
+                conn.execute('COMMIT')
+                break
+            except sqlite3.Error as e:
+                log.warning('leaderboard write of %d scores failed (attempt %d/%d): %s',
+                            len(batch), attempt + 1, WRITE_ATTEMPTS, e)
+                try:
+                    if conn.in_transaction:
+                        conn.execute('ROLLBACK')
+                except sqlite3.Error:
+                    conn.close()  # Unusable; start over on a fresh connection
+                    conn = self.connect()
+                if attempt + 1 < WRITE_ATTEMPTS:
+                    time.sleep(self.retry_delay * 2 ** attempt)
+        else:
+            log.error('dropping %d leaderboard scores after %d failed writes', len(batch), WRITE_ATTEMPTS)
+            self.dropped += len(batch)
+            return conn
+
+        self.batches += 1
+        self.written += conn.total_changes - changes  # Repeated replays were ignored
+        try:
+            self.refresh()
+        except sqlite3.Error as e:
+            log.warning('leaderboard refresh failed, retrying on the next read: %s', e)
+        return conn
+
+    def refresh(self):
+        with self.lock:
+            rows = self.reader.execute(
+                'SELECT id, player, score FROM scores WHERE id > ? ORDER BY id', (self.last_id,)).fetchall()
+            for row_id, player, score in rows:
+                if score > self.best.get(player, -1):
+                    self.best[player] = score
+                if len(self.top) < self.top_n or (-score, row_id) < self.top[-1][:2]:
+                    bisect.insort(self.top, (-score, row_id, player))
+                    del self.top[self.top_n:]
+            if rows:
+                self.last_id = rows[-1][0]
+            self.last_refresh = time.monotonic()
+
+    def maybe_refresh(self):
+        # Cheap staleness bound for rows committed by other processes
+        if time.monotonic() - self.last_refresh > self.refresh_interval:
+            self.refresh()
+
+    def has_replay(self, replay):
+        # Whether a score for this replay key was committed, by any process
+        with self.lock:
+            row = self.reader.execute('SELECT 1 FROM scores WHERE replay = ?', (replay,)).fetchone()
+        return row is not None
+
+    def top_scores(self, n=10):
+        self.maybe_refresh()
+        with self.lock:
+            return [(player, -neg_score) for neg_score, _, player in self.top[:max(0, n)]]
+
+    def player_best(self, player):
+        self.maybe_refresh()
+        with self.lock:
+            return self.best.get(player)
+
+    def close(self):
+        self.queue.put(None)
+        self.writer.join()
+        self.reader.close()
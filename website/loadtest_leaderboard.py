@@ -0,0 +1,91 @@
+"""Sustained read/write load test for the SQLite leaderboard.
+
+    python website/loadtest_leaderboard.py --seconds 10 --writers 4 --readers 8
+
+Writer threads submit scores as fast as they can while reader threads hit
+the top-N and per-player-best lookups. Reports committed writes/s, reads/s,
+read latency percentiles and the group-commit batch size, against a
+throwaway database file. --naive also times the ORDER BY query the
+in-memory index replaces.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'game'))
+
+from leaderboard import Leaderboard
+from timings import percentile  # pygame-free
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--players', type=int, default=10000)
+    parser.add_argument('--naive', action='store_true', help='also time ORDER BY reads straight from SQLite')
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'loadtest.db')
+    board = Leaderboard(path)
+    stop = threading.Event()
+    submitted = [0] * args.writers
+    latencies = [[] for _ in range(args.readers)]
+
+    def writer(index):
+        rng = random.Random(index)
+        while not stop.is_set():
+            board.add(f'player{rng.randrange(args.players)}', int(rng.expovariate(1 / 20)))
+            submitted[index] += 1
+            if submitted[index] % 256 == 0:
+                time.sleep(0)  # Let readers and the committer run
+
+    def reader(index):
+        rng = random.Random(-index - 1)
+        samples = latencies[index]
+        while not stop.is_set():
+            start = time.perf_counter()
+            if rng.random() < 0.5:
+                board.top_scores(10)
+            else:
+                board.player_best(f'player{rng.randrange(args.players)}')
+            samples.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(args.writers)]
+    threads += [threading.Thread(target=reader, args=(i,)) for i in range(args.readers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    board.close()
+    elapsed = time.perf_counter() - start
+
+    rows = sqlite3.connect(path).execute('SELECT COUNT(*) FROM scores').fetchone()[0]
+    reads = sorted(sample for samples in latencies for sample in samples)
+    print(f'{args.seconds:.0f}s, {args.writers} writers, {args.readers} readers')
+    print(f'writes: {sum(submitted)} submitted, {rows} committed ({rows / elapsed:,.0f}/s) '
+          f'in {board.batches} batches (avg {rows / max(1, board.batches):.0f} rows/commit)')
+    print(f'reads:  {len(reads)} ({len(reads) / elapsed:,.0f}/s), latency p50 {percentile(reads, 0.5) * 1e6:.1f} us, '
+          f'p99 {percentile(reads, 0.99) * 1e6:.1f} us, max {reads[-1] * 1e6 if reads else 0:.1f} us')
+
+    if args.naive:
+        conn = sqlite3.connect(path)
+        count = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < 2:
+            conn.execute('SELECT player, score FROM scores ORDER BY score DESC, id LIMIT 10').fetchall()
+            conn.execute('SELECT MAX(score) FROM scores WHERE player = ?', ('player1',)).fetchone()
+            count += 2
+        naive = (time.perf_counter() - start) / count
+        print(f'naive:  ORDER BY / per-player MAX straight from SQLite over {rows} rows: {naive * 1e6:.1f} us per read')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+import hashlib
+import multiprocessing
+import os
+import sys
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+GAME_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'game')
+MAX_REPLAY_BYTES = 16 * 1024
+MAX_REPLAY_FRAMES = 60 * 60 * 60  # One hour of play at 60 steps/s bounds the CPU per job
+
+class DuplicateReplay(ValueError):
+    """The same run was already submitted, by this player or another"""
+
+def replay_key(data):
+    """Identity of the run in an uploaded replay, or None if it doesn't parse.
+
+    The same physics, seed, flaps and length always replay the same way,
+    so the key ignores the claimed score, the version and how the flaps
+    happen to be encoded.
+    """
+    if GAME_DIR not in sys.path:
+        sys.path.insert(0, GAME_DIR)
+    from replay import Replay
+
+    try:
+        replay = Replay.from_bytes(data)
+    except ValueError:
+        return None
+    run = (replay.physics, replay.seed, replay.frames, tuple(replay.flaps))
+    return hashlib.sha256(repr(run).encode()).hexdigest()
+
+def verify_replay(data):
+    """Re-simulate an uploaded replay (runs in a pool process)"""
+    if GAME_DIR not in sys.path:
+        sys.path.insert(0, GAME_DIR)
+    from replay import Replay
+    from core import replay_profile, run_replay
+
+    try:
+        replay = Replay.from_bytes(data)
+    except ValueError as e:
+        return {'status': 'rejected', 'reason': str(e)}
+    if replay.frames > MAX_REPLAY_FRAMES:
+        return {'status': 'rejected', 'reason': 'replay is too long'}
+
+    # Desktop and web profiles have different physics; the header says which one recorded it
+    try:
+        profile = replay_profile(replay)
+    except ValueError:
+        return {'status': 'rejected', 'reason': 'unknown physics constants'}
+    sim = run_replay(replay, profile)
+    if (sim.frame, sim.score) != (replay.frames, replay.score):
+        return {'status': 'rejected', 'reason': 'replay does not reproduce the claimed score'}
+    return {'status': 'accepted', 'score': sim.score, 'frames': sim.frame}
+
+class ReplayVerifier:
+    """Verifies replays in a process pool, off the request workers.
+
+    At most max_pending replays are queued or running at once; submit()
+    returns None beyond that, or when no working pool can be had, so the
+    caller can shed load with a 503.
+
+    Each run is accepted once: submit() raises DuplicateReplay for a run
+    that is pending or accepted here, or that is_known(key) reports as
+    already on the board (e.g. accepted by another gunicorn worker).
+    """
+
+    def __init__(self, workers=None, max_pending=64, max_jobs=4096, on_accepted=None, is_known=None):
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.max_jobs = max_jobs
+        self.on_accepted = on_accepted  # on_accepted(player, score, key)
+        self.is_known = is_known
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.lock = threading.Lock()
+        self.jobs = OrderedDict()
+        self.keys = {}  # Run key -> job id, for pending and accepted jobs
+        self.pool = None
+
+    def get_pool(self):
+        # Created lazily so every gunicorn worker gets its own pool after forking
+        with self.lock:
+            if self.pool is None:
+                context = multiprocessing.get_context('spawn')
+                self.pool = ProcessPoolExecutor(self.workers, mp_context=context)
+            return self.pool
+
+    def drop_pool(self, pool):
+        # A child that dies (OOM kill, segfault) breaks the whole pool for
+        # good; forget it so get_pool() starts a fresh one
+        with self.lock:
+            if self.pool is pool:
+                self.pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, data, player):
+        # Malformed replays get no key; the pool rejects them with a reason
+        key = replay_key(data)
+        if key is not None and self.is_known and self.is_known(key):
+            raise DuplicateReplay('this replay has already been submitted')
+        if not self.slots.acquire(blocking=False):
+            return None
+        job_id = uuid.uuid4().hex
+        with self.lock:
+            if key is not None and key in self.keys:
+                self.slots.release()
+                raise DuplicateReplay('this replay has already been submitted')
+            self.jobs[job_id] = {'status': 'pending', 'player': player, 'key': key}
+            if key is not None:
+                self.keys[key] = job_id
+            self.evict_finished()
+        future = None
+        try:
+            for _ in range(2):  # Retry once on a fresh pool
+                pool = self.get_pool()
+                try:
+                    future = pool.submit(verify_replay, data)
+                    break
+                except BrokenProcessPool:
+                    self.drop_pool(pool)
+        except Exception:
+            self.forget(job_id)
+            raise
+        if future is None:
+            self.forget(job_id)
+            return None
+        future.add_done_callback(partial(self.finished, job_id))
+        return job_id
+
+    def forget(self, job_id):
+        # Undo submit() for a job that never reached the pool
+        self.slots.release()
+        with self.lock:
+            job = self.jobs.pop(job_id)
+            self.keys.pop(job['key'], None)
+
+    def finished(self, job_id, future):
+        self.slots.release()
+        try:
+            result = future.result()
+        except Exception:
+            result = {'status': 'error', 'reason': 'verification failed'}
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return
+            job.update(result)
+            if result['status'] != 'accepted':
+                # A rejected or failed run may be fixed up and submitted again
+                self.keys.pop(job['key'], None)
+        if result['status'] == 'accepted' and self.on_accepted:
+            self.on_accepted(job['player'], result['score'], job['key'])
+
+    def evict_finished(self):
+        # Forget the oldest finished jobs once the table is full (caller holds
+        # the lock); by then is_known() answers for the runs they accepted
+        excess = len(self.jobs) - self.max_jobs
+        for job_id in [j for j, job in self.jobs.items() if job['status'] != 'pending'][:max(0, excess)]:
+            self.keys.pop(self.jobs.pop(job_id)['key'], None)
+
+    def status(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            return {name: value for name, value in job.items() if name != 'key'}
+
+    def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)